@@ -5,13 +5,95 @@ Demonstrates discrete I/O, industrial networking, and hardware integration
 """
 
 import socket
+import selectors
 import struct
 import time
 import logging
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
+# Precompiled Modbus TCP framing (MBAP header + read/write PDU)
+_MODBUS_REQ_STRUCT = struct.Struct('>HHHBBHH')
+_MODBUS_REG_RESP = struct.Struct('>H')
+
+def _build_request(transaction_id: int, unit_id: int, function_code: int,
+                   address: int, value: int) -> bytes:
+    """
+    Build a Modbus TCP request packet (MBAP header + PDU)
+    """
+    return _MODBUS_REQ_STRUCT.pack(transaction_id, 0x0000, 0x0006, unit_id,
+                                   function_code, address, value)
+
+def _parse_register_u16(response: bytes) -> Optional[int]:
+    """
+    Extract the first 16-bit register from a read registers response
+    """
+    if len(response) < 11:
+        return None
+    # Extract 16-bit register value without slicing the response
+    return _MODBUS_REG_RESP.unpack_from(response, 9)[0]
+
+def _parse_coil_bit(response: bytes) -> Optional[bool]:
+    """
+    Extract the first bit from a read coils/discrete inputs response
+    """
+    if len(response) < 10:
+        return None
+    # Skip header, test first bit of the data byte
+    return (response[9] & 0x01) != 0
+
+# Bit values (LSB first) for each possible packed discrete input byte
+_BIT_TABLE = tuple(tuple(((byte >> i) & 0x01) != 0 for i in range(8)) for byte in range(256))
+
+# Modbus RTU framing: unit/function/address/value PDU followed by CRC-16
+_RTU_PDU_STRUCT = struct.Struct('>BBHH')
+
+def _crc16_table() -> Tuple[int, ...]:
+    """
+    Precompute the CRC-16/MODBUS lookup table (reflected polynomial 0xA001)
+    """
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 0x0001 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+_CRC16_TABLE = _crc16_table()
+
+def _crc16_modbus(data: bytes) -> int:
+    """
+    Compute CRC-16/MODBUS one table lookup per byte
+    """
+    crc = 0xFFFF
+    table = _CRC16_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+def _build_rtu_frame(unit_id: int, function_code: int, address: int, value: int) -> bytes:
+    """
+    Build a Modbus RTU frame (PDU + little-endian CRC)
+    """
+    pdu = _RTU_PDU_STRUCT.pack(unit_id, function_code, address, value)
+    return pdu + _crc16_modbus(pdu).to_bytes(2, 'little')
+
+# Use the compiled frame helpers when the optional extension is built
+try:
+    from hardware_interface._modbus_c import (
+        build_request as _build_request,
+        parse_register_u16 as _parse_register_u16,
+        parse_coil_bit as _parse_coil_bit,
+    )
+except ImportError:
+    pass
+
 class PLCConnectionType(Enum):
     MODBUS_TCP = "modbus_tcp"
     MODBUS_RTU = "modbus_rtu"
@@ -24,6 +106,33 @@ class IOPoint:
     data_type: str
     access: str  # 'read', 'write', 'read_write'
 
+@dataclass(eq=False)
+class PLCConnection:
+    """
+    Pooled PLC socket with its own receive buffer and transaction state
+    """
+    sock: socket.socket
+    rxbuf: bytearray = field(default_factory=lambda: bytearray(1024))
+    txid: int = 0
+    inflight: Dict[int, Tuple[str, int]] = field(default_factory=dict)
+    
+    def __post_init__(self):
+        self.rxview = memoryview(self.rxbuf)
+
+    def recv(self) -> memoryview:
+        """
+        Receive into the preallocated buffer; the view is valid until the next receive
+        """
+        received = self.sock.recv_into(self.rxbuf)
+        return self.rxview[:received]
+
+    def next_transaction_id(self) -> int:
+        """
+        Allocate the next Modbus transaction ID on this socket, wrapping at 0xFFFF
+        """
+        self.txid = (self.txid % 0xFFFF) + 1
+        return self.txid
+
 class PLCInterface:
     """
     Industrial PLC communication interface supporting multiple protocols
@@ -31,10 +140,20 @@ class PLCInterface:
     
     def __init__(self, config: Dict):
         self.config = config
-        self.connection = None
         self.is_connected = False
         self.logger = logging.getLogger(__name__)
         
+        # Settings read on every transaction, resolved once
+        self._unit_id = config.get('unit_id', 1)
+        self._timeout = config.get('timeout', 5.0)
+        self._analog_scale = config.get('analog_scale', {})
+        self._analog_offset = config.get('analog_offset', {})
+        
+        # Pool of idle PLC sockets; each transaction checks one out
+        self._pool: queue.SimpleQueue = queue.SimpleQueue()
+        self._connections: List[PLCConnection] = []
+        self._pool_lock = threading.Lock()
+        
         # Define I/O mapping for marking system
         self.discrete_inputs = {
             0: IOPoint(0, "Product Present Sensor", "bool", "read"),
@@ -54,6 +173,21 @@ class PLCInterface:
             0: IOPoint(0, "Line Speed", "float", "read"),
             1: IOPoint(1, "Print Quality Sensor", "float", "read")
         }
+        
+        # Parallel address/description tables for the status polling path;
+        # the IOPoint maps above remain the source of point metadata
+        self._di_addrs = tuple(self.discrete_inputs)
+        self._di_desc = tuple(point.description for point in self.discrete_inputs.values())
+        self._ai_addrs = tuple(self.analog_inputs)
+        self._ai_desc = tuple(point.description for point in self.analog_inputs.values())
+        self._ai_scale = tuple(self._analog_scale.get(addr, 1.0) for addr in self._ai_addrs)
+        self._ai_offset = tuple(self._analog_offset.get(addr, 0.0) for addr in self._ai_addrs)
+        
+        # Requests for mapped points never change; build each frame once
+        self._read_di_req = {addr: self._build_modbus_request(0x02, addr, 1) for addr in self.discrete_inputs}
+        self._read_reg_req = {addr: self._build_modbus_request(0x04, addr, 1) for addr in self.analog_inputs}
+        self._write_coil_on = {addr: self._build_modbus_request(0x05, addr, 0xFF00) for addr in self.discrete_outputs}
+        self._write_coil_off = {addr: self._build_modbus_request(0x05, addr, 0x0000) for addr in self.discrete_outputs}
 
     def connect(self) -> bool:
         """
@@ -65,33 +199,121 @@ class PLCInterface:
             elif self.config['protocol'] == PLCConnectionType.MODBUS_RTU.value:
                 return self._connect_modbus_rtu()
             else:
-                self.logger.error(f"Unsupported protocol: {self.config['protocol']}")
+                self.logger.error("Unsupported protocol: %s", self.config['protocol'])
                 return False
                 
         except Exception as e:
-            self.logger.error(f"PLC connection failed: {e}")
+            self.logger.error("PLC connection failed: %s", e)
             return False
 
     def _connect_modbus_tcp(self) -> bool:
         """
         Connect using Modbus TCP protocol
         """
-        try:
-            self.connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.connection.settimeout(self.config.get('timeout', 5.0))
-            
-            host = self.config['host']
-            port = self.config.get('port', 502)
+        host = self.config['host']
+        port = self.config.get('port', 502)
+        pool_size = max(1, self.config.get('pool_size', 4))
+        
+        # Open the connection pool in parallel; PLCs may accept fewer sockets
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            sockets = list(executor.map(lambda _: self._open_socket(host, port), range(pool_size)))
+        sockets = [sock for sock in sockets if sock is not None]
+        
+        if not sockets:
+            return False
+        if len(sockets) < pool_size:
+            self.logger.warning("PLC accepted %d of %d pooled connections", len(sockets), pool_size)
             
-            self.connection.connect((host, port))
-            self.is_connected = True
+        self._close_pool()
+        with self._pool_lock:
+            for sock in sockets:
+                connection = PLCConnection(sock)
+                self._connections.append(connection)
+                self._pool.put(connection)
+        self.is_connected = True
+        
+        self.logger.info("Connected to PLC via Modbus TCP: %s:%s (%d connections)", host, port, len(sockets))
+        return True
+
+    def _open_socket(self, host: str, port: int) -> Optional[socket.socket]:
+        """
+        Open a single Modbus TCP socket to the PLC
+        """
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(self._timeout)
+            sock.connect((host, port))
             
-            self.logger.info(f"Connected to PLC via Modbus TCP: {host}:{port}")
-            return True
+            # Modbus frames are tiny request/response pairs: send immediately
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if hasattr(socket, 'TCP_QUICKACK'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+                
+            # Detect a silently dropped PLC within a few seconds
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 5)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 1)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+            return sock
             
         except socket.error as e:
-            self.logger.error(f"Modbus TCP connection failed: {e}")
-            return False
+            self.logger.error("Modbus TCP connection failed: %s", e)
+            return None
+
+    @contextmanager
+    def _checkout(self) -> Iterator[PLCConnection]:
+        """
+        Borrow an idle pooled connection for the duration of a transaction
+        """
+        if not self._connections:
+            raise ConnectionError("No PLC connection available")
+        try:
+            connection = self._pool.get(timeout=self._timeout)
+        except queue.Empty:
+            raise ConnectionError("No PLC connection available")
+        try:
+            yield connection
+        except BaseException:
+            # A reply may still be in flight and would answer the next request
+            self._replace_connection(connection)
+            raise
+        with self._pool_lock:
+            # Connections closed by a reconnect are not returned to the new pool
+            if connection in self._connections:
+                self._pool.put(connection)
+
+    def _replace_connection(self, connection: PLCConnection):
+        """
+        Close a connection left in an unknown state and open a fresh one in its place
+        """
+        connection.sock.close()
+        with self._pool_lock:
+            if connection not in self._connections:
+                return
+            self._connections.remove(connection)
+            pool = self._pool
+            
+        sock = self._open_socket(self.config['host'], self.config.get('port', 502))
+        if sock is None:
+            return
+        with self._pool_lock:
+            if self._pool is not pool:
+                sock.close()
+                return
+            replacement = PLCConnection(sock)
+            self._connections.append(replacement)
+            pool.put(replacement)
+
+    def _close_pool(self):
+        """
+        Close all pooled sockets and reset the pool
+        """
+        with self._pool_lock:
+            for connection in self._connections:
+                connection.sock.close()
+            self._connections = []
+            self._pool = queue.SimpleQueue()
 
     def _connect_modbus_rtu(self) -> bool:
         """
@@ -110,17 +332,21 @@ class PLCInterface:
             return None
             
         try:
-            # Construct Modbus read discrete inputs request
-            function_code = 0x02  # Read Discrete Inputs
-            request = self._build_modbus_request(function_code, address, 1)
-            
-            self.connection.send(request)
-            response = self.connection.recv(1024)
+            request = self._read_di_req.get(address)
+            if request is None:
+                # Construct Modbus read discrete inputs request
+                function_code = 0x02  # Read Discrete Inputs
+                request = self._build_modbus_request(function_code, address, 1)
             
-            return self._parse_discrete_response(response)
+            with self._checkout() as connection:
+                connection.sock.send(request)
+                response = connection.recv()
+                
+                # The view is into the connection's buffer: parse before releasing it
+                return self._parse_discrete_response(response)
             
         except Exception as e:
-            self.logger.error(f"Failed to read discrete input {address}: {e}")
+            self.logger.error("Failed to read discrete input %s: %s", address, e)
             return None
 
     def write_discrete_output(self, address: int, value: bool) -> bool:
@@ -131,20 +357,93 @@ class PLCInterface:
             return False
             
         try:
-            # Construct Modbus write single coil request
-            function_code = 0x05  # Write Single Coil
             coil_value = 0xFF00 if value else 0x0000
-            request = self._build_modbus_request(function_code, address, coil_value)
+            request = (self._write_coil_on if value else self._write_coil_off).get(address)
+            if request is None:
+                # Construct Modbus write single coil request
+                function_code = 0x05  # Write Single Coil
+                request = self._build_modbus_request(function_code, address, coil_value)
             
-            self.connection.send(request)
-            response = self.connection.recv(1024)
+            with self._checkout() as connection:
+                connection.sock.send(request)
+                response = connection.recv()
+                
+                return self._verify_write_response(response, address, coil_value)
             
-            return self._verify_write_response(response, address, coil_value)
+        except Exception as e:
+            self.logger.error("Failed to write discrete output %s: %s", address, e)
+            return False
+
+    def queue_discrete_output(self, address: int, value: bool,
+                              batch: Optional[List[Tuple[int, int]]] = None) -> List[Tuple[int, int]]:
+        """
+        Add a discrete output write to a caller-owned batch for flush()
+        Starts a new batch when none is given; returns the batch
+        """
+        if batch is None:
+            batch = []
+        coil_value = 0xFF00 if value else 0x0000
+        batch.append((address, coil_value))
+        return batch
+
+    def flush(self, writes: List[Tuple[int, int]]) -> bool:
+        """
+        Send a batch of queued writes in one write and drain their responses
+        """
+        if not writes:
+            return True
+            
+        if not self.is_connected:
+            return False
             
+        try:
+            with self._checkout() as connection:
+                # Tag each frame with a unique transaction ID on this socket
+                function_code = 0x05  # Write Single Coil
+                frames = []
+                for address, coil_value in writes:
+                    transaction_id = connection.next_transaction_id()
+                    frames.append(self._build_modbus_request(function_code, address, coil_value, transaction_id))
+                    connection.inflight[transaction_id] = ("coil", address)
+                    
+                try:
+                    connection.sock.sendall(b''.join(frames))
+                    return self._drain_responses(connection)
+                finally:
+                    connection.inflight.clear()
+                    
         except Exception as e:
-            self.logger.error(f"Failed to write discrete output {address}: {e}")
+            self.logger.error("Failed to flush queued writes: %s", e)
             return False
 
+    def _drain_responses(self, connection: PLCConnection) -> bool:
+        """
+        Receive responses until every in-flight transaction is answered
+        """
+        # Responses may arrive coalesced or split; frame them by MBAP length
+        success = True
+        buffer = b''
+        while connection.inflight:
+            data = connection.recv()
+            if not data:
+                raise ConnectionError("PLC closed connection")
+            buffer += data
+            
+            while len(buffer) >= 7:
+                frame_len = 6 + _MODBUS_REG_RESP.unpack_from(buffer, 4)[0]
+                if len(buffer) < frame_len:
+                    break
+                transaction_id = _MODBUS_REG_RESP.unpack_from(buffer, 0)[0]
+                kind, address = connection.inflight.pop(transaction_id, (None, None))
+                if kind is None:
+                    self.logger.warning("Unexpected Modbus transaction ID %d", transaction_id)
+                elif buffer[7] & 0x80:
+                    self.logger.error("PLC rejected %s write to %s", kind, address)
+                    success = False
+                buffer = buffer[frame_len:]
+                
+        return success
+
     def read_analog_input(self, address: int) -> Optional[float]:
         """
         Read analog input from PLC
@@ -153,72 +452,118 @@ class PLCInterface:
             return None
             
         try:
-            # Construct Modbus read input registers request
-            function_code = 0x04  # Read Input Registers
-            request = self._build_modbus_request(function_code, address, 1)
-            
-            self.connection.send(request)
-            response = self.connection.recv(1024)
+            request = self._read_reg_req.get(address)
+            if request is None:
+                # Construct Modbus read input registers request
+                function_code = 0x04  # Read Input Registers
+                request = self._build_modbus_request(function_code, address, 1)
             
-            raw_value = self._parse_register_response(response)
+            with self._checkout() as connection:
+                connection.sock.send(request)
+                response = connection.recv()
+                
+                raw_value = self._parse_register_response(response)
             if raw_value is not None:
-                # Convert to engineering units based on configuration
-                scale = self.config.get('analog_scale', {}).get(address, 1.0)
-                offset = self.config.get('analog_offset', {}).get(address, 0.0)
-                return (raw_value * scale) + offset
+                return self._scale_analog(address, raw_value)
+                
+            return None
+            
+        except Exception as e:
+            self.logger.error("Failed to read analog input %s: %s", address, e)
+            return None
+
+    def read_discrete_inputs(self, start: int, count: int) -> Optional[List[bool]]:
+        """
+        Read a contiguous block of discrete inputs in a single transaction
+        """
+        if not self.is_connected:
+            return None
+            
+        try:
+            # One Read Discrete Inputs request covers the whole block
+            function_code = 0x02  # Read Discrete Inputs
+            request = self._build_modbus_request(function_code, start, count)
+            
+            with self._checkout() as connection:
+                connection.sock.send(request)
+                response = connection.recv()
                 
+                return self._parse_discrete_block(response, count)
+            
+        except Exception as e:
+            self.logger.error("Failed to read discrete inputs %d-%d: %s", start, start + count - 1, e)
             return None
+
+    def read_input_registers(self, start: int, count: int) -> Optional[List[int]]:
+        """
+        Read a contiguous block of raw input registers in a single transaction
+        """
+        if not self.is_connected:
+            return None
+            
+        try:
+            # One Read Input Registers request covers the whole block
+            function_code = 0x04  # Read Input Registers
+            request = self._build_modbus_request(function_code, start, count)
+            
+            with self._checkout() as connection:
+                connection.sock.send(request)
+                response = connection.recv()
+                
+                return self._parse_register_block(response, count)
             
         except Exception as e:
-            self.logger.error(f"Failed to read analog input {address}: {e}")
+            self.logger.error("Failed to read input registers %d-%d: %s", start, start + count - 1, e)
             return None
 
-    def _build_modbus_request(self, function_code: int, address: int, value: int) -> bytes:
+    def _scale_analog(self, address: int, raw_value: int) -> float:
+        """
+        Convert raw register value to engineering units based on configuration
+        """
+        scale = self._analog_scale.get(address, 1.0)
+        offset = self._analog_offset.get(address, 0.0)
+        return (raw_value * scale) + offset
+
+    def _build_modbus_request(self, function_code: int, address: int, value: int,
+                              transaction_id: int = 0x0001) -> bytes:
         """
         Build Modbus TCP request packet
         """
-        # Modbus TCP header
-        transaction_id = 0x0001
-        protocol_id = 0x0000
-        length = 0x0006
-        unit_id = self.config.get('unit_id', 1)
-        
-        # Modbus PDU
-        starting_address = address
-        quantity = value
-        
-        request = struct.pack('>HHHBBBHH',
-                            transaction_id,
-                            protocol_id,
-                            length,
-                            unit_id,
-                            function_code,
-                            starting_address,
-                            quantity)
-        
-        return request
+        return _build_request(transaction_id, self._unit_id,
+                              function_code, address, value)
 
     def _parse_discrete_response(self, response: bytes) -> Optional[bool]:
         """
         Parse Modbus discrete input response
         """
-        if len(response) < 9:
-            return None
-            
-        # Skip header, get data byte
-        data_byte = response[9]
-        return bool(data_byte & 0x01)
+        return _parse_coil_bit(response)
 
     def _parse_register_response(self, response: bytes) -> Optional[int]:
         """
         Parse Modbus register response
         """
-        if len(response) < 11:
+        return _parse_register_u16(response)
+
+    def _parse_discrete_block(self, response: bytes, count: int) -> Optional[List[bool]]:
+        """
+        Parse packed bits from a multi-input discrete response
+        """
+        byte_count = (count + 7) // 8
+        if len(response) < 9 + byte_count:
+            return None
+            
+        # Inputs are packed LSB-first, eight per data byte; expand a byte at a time
+        bits = [bit for byte in response[9:9 + byte_count] for bit in _BIT_TABLE[byte]]
+        return bits[:count]
+
+    def _parse_register_block(self, response: bytes, count: int) -> Optional[List[int]]:
+        """
+        Parse consecutive 16-bit registers from a multi-register response
+        """
+        if len(response) < 9 + 2 * count:
             return None
             
-        # Extract 16-bit register value
-        register_value = struct.unpack('>H', response[9:11])[0]
-        return register_value
+        return list(struct.unpack_from(f'>{count}H', response, 9))
 
     def _verify_write_response(self, response: bytes, address: int, value: int) -> bool:
         """
@@ -234,6 +579,7 @@ class PLCInterface:
         if not self.is_connected:
             return {"status": "disconnected"}
             
+        poll_start = time.monotonic_ns()
         status = {
             "connection": "connected",
             "discrete_inputs": {},
@@ -241,16 +587,24 @@ class PLCInterface:
             "last_update": time.time()
         }
         
-        # Read all discrete inputs
-        for addr, point in self.discrete_inputs.items():
-            value = self.read_discrete_input(addr)
-            status["discrete_inputs"][point.description] = value
+        # Read all discrete inputs in one request (addresses are contiguous)
+        di_values = self.read_discrete_inputs(self._di_addrs[0], len(self._di_addrs))
+        if di_values:
+            status["discrete_inputs"] = dict(zip(self._di_desc, di_values))
+        else:
+            status["discrete_inputs"] = dict.fromkeys(self._di_desc)
             
-        # Read all analog inputs
-        for addr, point in self.analog_inputs.items():
-            value = self.read_analog_input(addr)
-            status["analog_inputs"][point.description] = value
+        # Read all analog inputs in one request (addresses are contiguous)
+        ai_values = self.read_input_registers(self._ai_addrs[0], len(self._ai_addrs))
+        if ai_values:
+            status["analog_inputs"] = dict(zip(self._ai_desc, [
+                (raw * scale) + offset
+                for raw, scale, offset in zip(ai_values, self._ai_scale, self._ai_offset)
+            ]))
+        else:
+            status["analog_inputs"] = dict.fromkeys(self._ai_desc)
             
+        status["poll_duration_ms"] = (time.monotonic_ns() - poll_start) / 1_000_000
         return status
 
     def execute_marking_sequence(self) -> bool:
@@ -270,18 +624,16 @@ class PLCInterface:
                 self.logger.warning("System not ready for marking")
                 return False
                 
-            # Start marking operation
-            self.write_discrete_output(0, True)  # Marking Start
-            self.write_discrete_output(1, True)  # Status LED
-            
-            # Wait for marking complete signal
-            timeout = time.time() + 10.0  # 10 second timeout
-            while time.time() < timeout:
-                marking_complete = self.read_discrete_input(3)
-                if marking_complete:
-                    break
-                time.sleep(0.1)
-            else:
+            # Start marking operation (both writes go out in one send)
+            writes = self.queue_discrete_output(0, True)  # Marking Start
+            self.queue_discrete_output(1, True, writes)  # Status LED
+            if not self.flush(writes):
+                self.logger.error("Failed to start marking operation")
+                self.write_discrete_output(2, True)  # Error indicator
+                return False
+            
+            # Wait for marking complete signal (10 second timeout)
+            if not self._wait_for_discrete_input(3, 10.0):
                 self.logger.error("Marking operation timeout")
                 self.write_discrete_output(2, True)  # Error indicator
                 return False
@@ -295,16 +647,59 @@ class PLCInterface:
             return True
             
         except Exception as e:
-            self.logger.error(f"Marking sequence failed: {e}")
+            self.logger.error("Marking sequence failed: %s", e)
             self.write_discrete_output(2, True)  # Error indicator
             return False
 
+    def _wait_for_discrete_input(self, address: int, timeout: float) -> bool:
+        """
+        Poll a discrete input until it is set, keeping one request in flight
+        """
+        if not self.is_connected:
+            return False
+            
+        request = self._read_di_req.get(address)
+        if request is None:
+            function_code = 0x02  # Read Discrete Inputs
+            request = self._build_modbus_request(function_code, address, 1)
+        deadline = time.monotonic_ns() + int(timeout * 1_000_000_000)
+        
+        try:
+            with self._checkout() as connection, selectors.DefaultSelector() as selector:
+                selector.register(connection.sock, selectors.EVENT_READ)
+                connection.sock.send(request)
+                outstanding = True
+                
+                # Re-poll as soon as each response arrives instead of sleeping
+                while time.monotonic_ns() < deadline:
+                    if not selector.select(timeout=0.1):
+                        continue
+                    response = connection.recv()
+                    outstanding = False
+                    if not response:
+                        raise ConnectionError("PLC closed connection")
+                    if self._parse_discrete_response(response):
+                        return True
+                    connection.sock.send(request)
+                    outstanding = True
+                    
+                # Drain the last poll so it is not mistaken for a later response
+                if outstanding:
+                    if not selector.select(timeout=connection.sock.gettimeout()):
+                        raise TimeoutError("PLC did not answer the last poll")
+                    connection.recv()
+                    
+        except Exception as e:
+            self.logger.error("Failed to poll discrete input %s: %s", address, e)
+            
+        return False
+
     def disconnect(self):
         """
         Close PLC connection
         """
-        if self.connection:
-            self.connection.close()
+        if self._connections:
+            self._close_pool()
             self.is_connected = False
             self.logger.info("PLC connection closed")
 
@@ -6,11 +6,16 @@ Demonstrates comprehensive system integration and startup procedures
 
 import sys
 import os
+import atexit
+import itertools
+import queue
 import logging
+import logging.handlers
 import asyncio
+import multiprocessing
 import threading
 import signal
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from pathlib import Path
 
 # Add project root to Python path
@@ -45,6 +50,94 @@ SYSTEM_CONFIG = {
     }
 }
 
+# How long a TCP handler waits for the PLC process to finish a marking cycle
+PLC_COMMAND_TIMEOUT = 30.0
+
+# How long startup waits for the TCP server process to report its bind result
+SERVER_START_TIMEOUT = 10.0
+
+def _run_server(config: Dict, command_queue, response_queue, log_queue, client_count, started_pipe):
+    """
+    TCP server process entry point
+    Marking requests are forwarded to the PLC process over command_queue;
+    whether the listener bound is reported once over started_pipe
+    """
+    # The parent process owns shutdown; log records go to its listener
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    root_logger = logging.getLogger()
+    root_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root_logger.setLevel(getattr(logging, config["logging"]["level"]))
+    logger = logging.getLogger(__name__)
+    
+    tcp_server = MarkingSystemTCPServer(
+        host=config["tcp_server"]["host"],
+        port=config["tcp_server"]["port"]
+    )
+    waiters: Dict[int, asyncio.Future] = {}
+    request_ids = itertools.count()
+    
+    def resolve(waiter: asyncio.Future, result):
+        """Complete a waiting handler unless it already timed out"""
+        if not waiter.done():
+            waiter.set_result(result)
+    
+    def dispatch_responses():
+        """Route PLC results to waiting handlers and publish the client count"""
+        while True:
+            client_count.value = len(tcp_server.clients)
+            try:
+                request_id, result = response_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            waiter = waiters.pop(request_id, None)
+            if waiter:
+                waiter.get_loop().call_soon_threadsafe(resolve, waiter, result)
+    
+    async def plc_marking_handler(message):
+        """Custom handler for marking requests that uses PLC"""
+        request_id = next(request_ids)
+        waiter = asyncio.get_running_loop().create_future()
+        waiters[request_id] = waiter
+        
+        try:
+            # Execute marking sequence in the PLC process
+            command_queue.put((request_id, message["payload"].get("product_data", {})))
+            success, result = await asyncio.wait_for(waiter, PLC_COMMAND_TIMEOUT)
+            
+            if success:
+                return tcp_server._create_response(
+                    message["message_id"],
+                    "marking_response",
+                    {
+                        "success": True,
+                        "hardware_execution": True,
+                        "plc_status": result
+                    }
+                )
+            else:
+                return tcp_server._create_error_response(message["message_id"], result)
+                
+        except asyncio.TimeoutError:
+            waiters.pop(request_id, None)
+            logger.error("PLC marking handler timed out")
+            return tcp_server._create_error_response(
+                message["message_id"],
+                "Hardware error: PLC did not respond"
+            )
+    
+    # Replace default marking handler with PLC-integrated version
+    tcp_server.register_handler("marking_request", plc_marking_handler)
+    logger.info("PLC interface integrated with TCP server")
+    
+    threading.Thread(target=dispatch_responses, daemon=True).start()
+    try:
+        asyncio.run(tcp_server.start_server(on_started=lambda: started_pipe.send((True, None))))
+    except Exception as e:
+        if not tcp_server.is_running:
+            started_pipe.send((False, str(e)))
+        raise
+
 class IndustrialMarkingSystem:
     """
     Main application class that orchestrates all system components
@@ -52,14 +145,18 @@ class IndustrialMarkingSystem:
     
     def __init__(self):
         self.logger = self._setup_logging()
-        self.tcp_server: Optional[MarkingSystemTCPServer] = None
+        self.server_process: Optional[multiprocessing.Process] = None
+        self.command_queue = multiprocessing.Queue()
+        self.response_queue = multiprocessing.Queue()
+        self.client_count = multiprocessing.Value('i', 0)
+        self._server_started = False
         self.plc_interface: Optional[PLCInterface] = None
         self.network_monitor: Optional[IndustrialNetworkMonitor] = None
         self.is_running = False
-        
-        # Register signal handlers for graceful shutdown
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        self._shutdown_event = asyncio.Event()
+        self._shutting_down = False
+        self._tasks = []
+        self._plc_command: Optional[asyncio.Task] = None
         
         self.logger.info("Industrial Marking System initialized")
 
@@ -71,24 +168,36 @@ class IndustrialMarkingSystem:
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
         
+        # File and console handlers run on a listener thread so logging
+        # callers only pay for a queue put
+        formatter = logging.Formatter(SYSTEM_CONFIG["logging"]["format"])
+        file_handler = logging.FileHandler(SYSTEM_CONFIG["logging"]["file"])
+        stream_handler = logging.StreamHandler(sys.stdout)
+        file_handler.setFormatter(formatter)
+        stream_handler.setFormatter(formatter)
+        
+        # A process-safe queue so the TCP server process can log here too
+        self._log_queue = multiprocessing.Queue(-1)
+        listener = logging.handlers.QueueListener(self._log_queue, file_handler, stream_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        
         # Configure logging
-        logging.basicConfig(
-            level=getattr(logging, SYSTEM_CONFIG["logging"]["level"]),
-            format=SYSTEM_CONFIG["logging"]["format"],
-            handlers=[
-                logging.FileHandler(SYSTEM_CONFIG["logging"]["file"]),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        root_logger = logging.getLogger()
+        root_logger.setLevel(getattr(logging, SYSTEM_CONFIG["logging"]["level"]))
+        root_logger.addHandler(logging.handlers.QueueHandler(self._log_queue))
         
         return logging.getLogger(__name__)
 
-    def _signal_handler(self, signum, frame):
+    def _signal_handler(self, signum):
         """
-        Handle shutdown signals gracefully
+        Handle shutdown signals gracefully (runs on the event loop)
+        Only wakes the main loop; start_system then runs shutdown() once
         """
-        self.logger.info(f"Received signal {signum}, initiating graceful shutdown")
-        self.shutdown()
+        if self._shutdown_event.is_set():
+            return
+        self.logger.info("Received signal %s, initiating graceful shutdown", signum)
+        self._shutdown_event.set()
 
     async def start_system(self):
         """
@@ -97,11 +206,17 @@ class IndustrialMarkingSystem:
         try:
             self.logger.info("Starting Industrial Marking System...")
             
+            # Register signal handlers for graceful shutdown; the event loop
+            # runs them between callbacks rather than mid-syscall
+            loop = asyncio.get_running_loop()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(signum, self._signal_handler, signum)
+            
             # Step 1: Initialize PLC Interface
             self.logger.info("Initializing PLC interface...")
             self.plc_interface = PLCInterface(SYSTEM_CONFIG["plc_interface"])
             
-            if not self.plc_interface.connect():
+            if not await asyncio.to_thread(self.plc_interface.connect):
                 self.logger.warning("PLC connection failed - continuing in simulation mode")
             else:
                 self.logger.info("PLC interface connected successfully")
@@ -110,27 +225,27 @@ class IndustrialMarkingSystem:
             self.logger.info("Starting network monitor...")
             self.network_monitor = IndustrialNetworkMonitor(
                 interface=SYSTEM_CONFIG["network_monitor"]["interface"],
-                capture_port=SYSTEM_CONFIG["network_monitor"]["capture_port"]
+                capture_port=SYSTEM_CONFIG["network_monitor"]["capture_port"],
+                marking_port=SYSTEM_CONFIG["tcp_server"]["port"]
             )
             self.network_monitor.start_monitoring()
             
-            # Step 3: Initialize and start TCP Server
+            # Step 3: Start TCP server in its own process so socket handling
+            # and PLC I/O do not contend for one interpreter lock
             self.logger.info("Starting TCP server...")
-            self.tcp_server = MarkingSystemTCPServer(
-                host=SYSTEM_CONFIG["tcp_server"]["host"],
-                port=SYSTEM_CONFIG["tcp_server"]["port"]
-            )
-            
-            # Integrate PLC interface with TCP server if available
-            if self.plc_interface:
-                self._integrate_plc_with_server()
-            
-            # Start TCP server in separate thread
-            server_thread = threading.Thread(
-                target=self.tcp_server.start_server,
+            started_reader, started_writer = multiprocessing.Pipe(duplex=False)
+            self.server_process = multiprocessing.Process(
+                target=_run_server,
+                args=(SYSTEM_CONFIG, self.command_queue, self.response_queue,
+                      self._log_queue, self.client_count, started_writer),
                 daemon=True
             )
-            server_thread.start()
+            self.server_process.start()
+            started_writer.close()
+            self._server_started = await asyncio.to_thread(self._wait_for_server_start, started_reader)
+            
+            # Serve marking requests forwarded by the TCP server process
+            self._tasks.append(asyncio.create_task(self._serve_plc_commands()))
             
             # Step 4: Perform system health check
             await self._perform_system_health_check()
@@ -142,47 +257,59 @@ class IndustrialMarkingSystem:
             await self._main_application_loop()
             
         except Exception as e:
-            self.logger.error(f"Failed to start system: {e}")
+            self.logger.error("Failed to start system: %s", e)
             raise
+        finally:
+            await self.shutdown()
 
-    def _integrate_plc_with_server(self):
+    def _wait_for_server_start(self, started_reader) -> bool:
         """
-        Integrate PLC interface with TCP server for hardware operations
+        Wait for the TCP server process to report whether its listener bound
         """
-        def plc_marking_handler(message):
-            """Custom handler for marking requests that uses PLC"""
-            try:
-                product_data = message.payload.get("product_data", {})
-                
-                # Execute marking sequence using PLC
-                success = self.plc_interface.execute_marking_sequence()
+        try:
+            if not started_reader.poll(SERVER_START_TIMEOUT):
+                self.logger.error("TCP server did not report startup within %.0f s", SERVER_START_TIMEOUT)
+                return False
+            started, error = started_reader.recv()
+        except EOFError:
+            self.logger.error("TCP server process exited before reporting startup")
+            return False
+        finally:
+            started_reader.close()
+            
+        if not started:
+            self.logger.error("TCP server failed to start: %s", error)
+        return started
+
+    async def _serve_plc_commands(self):
+        """
+        Execute marking requests forwarded by the TCP server process
+        """
+        while True:
+            command = await asyncio.to_thread(self.command_queue.get)
+            if command is None:
+                break
                 
-                if success:
-                    return self.tcp_server._create_response(
-                        message.message_id,
-                        "marking_response",
-                        {
-                            "success": True,
-                            "hardware_execution": True,
-                            "plc_status": self.plc_interface.get_system_status()
-                        }
-                    )
-                else:
-                    return self.tcp_server._create_error_response(
-                        message.message_id,
-                        "PLC marking sequence failed"
-                    )
-                    
-            except Exception as e:
-                self.logger.error(f"PLC marking handler error: {e}")
-                return self.tcp_server._create_error_response(
-                    message.message_id,
-                    f"Hardware error: {str(e)}"
-                )
-        
-        # Replace default marking handler with PLC-integrated version
-        self.tcp_server.register_handler("marking_request", plc_marking_handler)
-        self.logger.info("PLC interface integrated with TCP server")
+            request_id, product_data = command
+            # Shielded so cancelling this loop never abandons a PLC transaction
+            # mid-send; shutdown() waits for it before closing the PLC sockets
+            self._plc_command = asyncio.create_task(asyncio.to_thread(self._execute_plc_command, product_data))
+            result = await asyncio.shield(self._plc_command)
+            self.response_queue.put((request_id, result))
+
+    def _execute_plc_command(self, product_data: Dict) -> Tuple[bool, object]:
+        """
+        Run a marking sequence and return (success, PLC status or error message)
+        """
+        try:
+            # Execute marking sequence using PLC
+            if self.plc_interface.execute_marking_sequence():
+                return True, self.plc_interface.get_system_status()
+            return False, "PLC marking sequence failed"
+            
+        except Exception as e:
+            self.logger.error("PLC marking handler error: %s", e)
+            return False, f"Hardware error: {str(e)}"
 
     async def _perform_system_health_check(self):
         """
@@ -197,8 +324,8 @@ class IndustrialMarkingSystem:
             "lua_engine": False
         }
         
-        # Check TCP server
-        if self.tcp_server and self.tcp_server.is_running:
+        # Check TCP server: it must have bound its port and still be running
+        if self._server_started and self.server_process.is_alive():
             health_status["tcp_server"] = True
             
         # Check PLC interface
@@ -219,11 +346,11 @@ class IndustrialMarkingSystem:
         # Log health check results
         for component, status in health_status.items():
             status_text = "HEALTHY" if status else "UNHEALTHY"
-            self.logger.info(f"Health Check - {component}: {status_text}")
+            self.logger.info("Health Check - %s: %s", component, status_text)
         
         # Overall system health
         overall_health = all(health_status.values())
-        self.logger.info(f"Overall System Health: {'HEALTHY' if overall_health else 'DEGRADED'}")
+        self.logger.info("Overall System Health: %s", "HEALTHY" if overall_health else "DEGRADED")
         
         return health_status
 
@@ -235,20 +362,23 @@ class IndustrialMarkingSystem:
         
         try:
             while self.is_running:
-                # Perform periodic system maintenance
-                await asyncio.sleep(30)  # 30-second intervals
-                
-                # Check system health
-                await self._periodic_health_check()
-                
-                # Update system statistics
-                self._update_system_statistics()
+                # Perform periodic system maintenance at 30-second intervals,
+                # or leave immediately when shutdown is requested
+                try:
+                    await asyncio.wait_for(self._shutdown_event.wait(), timeout=30.0)
+                    break
+                except asyncio.TimeoutError:
+                    pass
                 
-                # Perform maintenance tasks
-                await self._perform_maintenance_tasks()
+                # Health check, statistics and maintenance run concurrently
+                await asyncio.gather(
+                    self._periodic_health_check(),
+                    asyncio.to_thread(self._update_system_statistics),
+                    self._perform_maintenance_tasks()
+                )
                 
         except Exception as e:
-            self.logger.error(f"Error in main application loop: {e}")
+            self.logger.error("Error in main application loop: %s", e)
         finally:
             self.logger.info("Exiting main application loop")
 
@@ -258,31 +388,32 @@ class IndustrialMarkingSystem:
         """
         if self.plc_interface and self.plc_interface.is_connected:
             try:
-                status = self.plc_interface.get_system_status()
+                # PLC I/O is blocking; keep it off the event loop
+                status = await asyncio.to_thread(self.plc_interface.get_system_status)
                 if status.get("status") == "disconnected":
                     self.logger.warning("PLC connection lost - attempting reconnection")
-                    self.plc_interface.connect()
+                    await asyncio.to_thread(self.plc_interface.connect)
             except Exception as e:
-                self.logger.error(f"PLC health check failed: {e}")
+                self.logger.error("PLC health check failed: %s", e)
 
     def _update_system_statistics(self):
         """
         Update system performance statistics
         """
         try:
-            if self.tcp_server:
-                client_count = len(self.tcp_server.clients)
-                if client_count > 0:
-                    self.logger.debug(f"Active TCP clients: {client_count}")
+            if self.server_process:
+                client_count = self.client_count.value
+                if client_count > 0 and self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("Active TCP clients: %d", client_count)
                     
             if self.network_monitor:
                 capture_summary = self.network_monitor.get_capture_summary()
                 packet_count = capture_summary.get("total_packets", 0)
-                if packet_count > 0:
-                    self.logger.debug(f"Network packets captured: {packet_count}")
+                if packet_count > 0 and self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("Network packets captured: %d", packet_count)
                     
         except Exception as e:
-            self.logger.error(f"Statistics update error: {e}")
+            self.logger.error("Statistics update error: %s", e)
 
     async def _perform_maintenance_tasks(self):
         """
@@ -294,20 +425,36 @@ class IndustrialMarkingSystem:
             # Update system metrics (simulate)
             pass
         except Exception as e:
-            self.logger.error(f"Maintenance task error: {e}")
+            self.logger.error("Maintenance task error: %s", e)
 
-    def shutdown(self):
+    async def shutdown(self):
         """
         Graceful system shutdown
+        Only the first call tears down; later calls return immediately
         """
+        if self._shutting_down:
+            return
+        self._shutting_down = True
         self.logger.info("Shutting down Industrial Marking System...")
         
         self.is_running = False
         
-        # Stop TCP server
-        if self.tcp_server:
-            self.tcp_server.stop_server()
+        # Wake the main loop and stop background tasks instead of waiting them out
+        self._shutdown_event.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        
+        # Let a marking command already talking to the PLC finish first
+        if self._plc_command:
+            await asyncio.gather(self._plc_command, return_exceptions=True)
+        
+        # Stop TCP server process and release the PLC command loop
+        if self.server_process:
+            self.server_process.terminate()
+            await asyncio.to_thread(self.server_process.join, 5.0)
             self.logger.info("TCP server stopped")
+        self.command_queue.put(None)
         
         # Stop network monitor
         if self.network_monitor:
@@ -316,7 +463,7 @@ class IndustrialMarkingSystem:
         
         # Disconnect PLC interface
         if self.plc_interface:
-            self.plc_interface.disconnect()
+            await asyncio.to_thread(self.plc_interface.disconnect)
             self.logger.info("PLC interface disconnected")
         
         self.logger.info("Industrial Marking System shutdown complete")
@@ -4,22 +4,222 @@ Handles network communication with client applications and monitoring systems
 Demonstrates TCP/IP networking, protocol design, and industrial connectivity
 """
 
+import asyncio
+import inspect
+import itertools
+import json
+import random
+import re
 import socket
 import threading
-import json
 import time
 import logging
-from typing import Dict, List, Optional, Callable
-from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Callable
+from dataclasses import dataclass, asdict, is_dataclass
 from datetime import datetime
 
-@dataclass
+# orjson is optional; fall back to the standard library encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Public message shape; the server itself passes plain dicts
+@dataclass(slots=True)
 class NetworkMessage:
     message_id: str
     timestamp: str
     message_type: str
     payload: Dict
     client_id: str = ""
+    
+    def to_dict(self) -> Dict:
+        """
+        Shallow dict of the message fields without asdict() reflection
+        """
+        return {
+            "message_id": self.message_id,
+            "timestamp": self.timestamp,
+            "message_type": self.message_type,
+            "payload": self.payload,
+            "client_id": self.client_id
+        }
+
+def _dumps(obj: Any) -> bytes:
+    """
+    Serialize a message (dict or dataclass) to JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    if isinstance(obj, NetworkMessage):
+        obj = obj.to_dict()
+    elif is_dataclass(obj):
+        obj = asdict(obj)
+    return json.dumps(obj).encode('utf-8')
+
+# Per-connection receive buffer size and how many idle buffers to keep
+RECV_BUFFER_SIZE = 65536
+MAX_POOLED_BUFFERS = 64
+
+# Connection limits: concurrent clients and accepted connections per second
+MAX_CLIENTS = 1024
+ACCEPT_RATE = 100
+
+# Kernel send/receive buffer size for accepted sockets
+SOCKET_BUFFER_SIZE = 64 * 1024
+
+# Heartbeat fast path: raw-byte patterns and preformatted reply
+_HEARTBEAT_TYPE = re.compile(rb'"message_type"\s*:\s*"heartbeat"')
+_MESSAGE_ID = re.compile(rb'"message_id"\s*:\s*"([^"\\]*)"')
+_HEARTBEAT_REPLY = (
+    b'{"message_id":"response_%b","timestamp":"%b","message_type":"heartbeat_response",'
+    b'"payload":{"server_time":"%b"},"client_id":""}\n'
+)
+
+# Status broadcast envelope; only system_status is serialized per cycle
+_STATUS_BROADCAST = (
+    b'{"message_id":"status_update_%d","timestamp":"%b","message_type":"status_broadcast",'
+    b'"payload":{"system_status":%b},"client_id":""}\n'
+)
+
+# Status broadcast period and the random spread applied to each wait
+STATUS_INTERVAL = 30.0
+STATUS_JITTER = 2.0
+
+# Pause reading from a client once this many lines are waiting
+MAX_PENDING_LINES = 64
+
+def _loads(data) -> Any:
+    """
+    Parse a JSON message from str or bytes
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class Connection(asyncio.BufferedProtocol):
+    """
+    Client connection reading newline-delimited JSON into a pooled buffer
+    The transport receives straight into the bytearray, so no bytes object
+    is allocated per read; complete lines are handled in arrival order.
+    Instances are also the server's per-client records in self.clients.
+    """
+    
+    __slots__ = (
+        'server', 'transport', 'client_id', 'address', 'connected_at', 'last_activity',
+        'buffer', 'view', 'read_pos', 'scan_pos', 'write_pos',
+        'lines', 'task', 'paused', 'write_paused'
+    )
+    
+    def __init__(self, server: "MarkingSystemTCPServer"):
+        self.server = server
+        self.transport = None
+        self.client_id = ""
+        self.address = None
+        self.connected_at = ""
+        self.last_activity = 0.0
+        self.buffer = None
+        self.view = None
+        self.read_pos = 0
+        self.scan_pos = 0
+        self.write_pos = 0
+        self.lines = asyncio.Queue()
+        self.task = None
+        self.paused = False
+        self.write_paused = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        if not self.server._admit_client():
+            transport.write(b'{"error":"server_full"}\n')
+            transport.close()
+            return
+        
+        sock = transport.get_extra_info('socket')
+        if sock is not None:
+            # Responses are small JSON lines: send immediately and ACK promptly
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if hasattr(socket, 'TCP_QUICKACK'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+            
+            # Let the kernel detect dead peers instead of per-message bookkeeping
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+        
+        self.buffer = self.server._acquire_buffer()
+        self.view = memoryview(self.buffer)
+        self.client_id = self.server._register_client(self)
+        self.task = asyncio.get_running_loop().create_task(self._consume())
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.view[self.write_pos:]
+
+    def buffer_updated(self, nbytes: int):
+        self.write_pos += nbytes
+        buffer = self.buffer
+        
+        # Only scan bytes that arrived since the last call
+        read_pos = self.read_pos
+        newline = buffer.find(b'\n', self.scan_pos, self.write_pos)
+        while newline >= 0:
+            line = bytes(self.view[read_pos:newline]).strip()
+            if line:
+                self.lines.put_nowait(line)
+            read_pos = newline + 1
+            newline = buffer.find(b'\n', read_pos, self.write_pos)
+        
+        if read_pos == self.write_pos:
+            # Everything consumed; rewind without copying
+            read_pos = self.write_pos = 0
+        elif self.write_pos == len(buffer):
+            # Buffer full: move the incomplete tail to the front
+            if read_pos == 0:
+                self.server.logger.warning("Client %s connection error: message exceeds %s bytes", self.client_id, len(buffer))
+                self.transport.abort()
+                return
+            tail = self.write_pos - read_pos
+            buffer[:tail] = self.view[read_pos:self.write_pos].tobytes()
+            read_pos = 0
+            self.write_pos = tail
+        self.read_pos = read_pos
+        self.scan_pos = self.write_pos
+        
+        # Activity is tracked at the clock task's resolution, not per read
+        self.last_activity = self.server._now
+        
+        if not self.paused and self.lines.qsize() >= MAX_PENDING_LINES:
+            self.paused = True
+            self.transport.pause_reading()
+
+    async def _consume(self):
+        while True:
+            line = await self.lines.get()
+            await self.server._process_message(line, self.client_id)
+            if self.paused and self.lines.qsize() < MAX_PENDING_LINES // 2:
+                self.paused = False
+                self.transport.resume_reading()
+
+    def pause_writing(self):
+        self.write_paused = True
+
+    def resume_writing(self):
+        self.write_paused = False
+
+    def connection_lost(self, exc: Optional[Exception]):
+        if exc:
+            self.server.logger.warning("Client %s connection error: %s", self.client_id, exc)
+        if self.task:
+            self.task.cancel()
+        if self.buffer is None:
+            return  # Rejected before it was registered
+        self.server._disconnect_client(self.client_id)
+        self.server._release_buffer(self.buffer)
+        self.buffer = self.view = None
 
 class MarkingSystemTCPServer:
     """
@@ -27,14 +227,35 @@ class MarkingSystemTCPServer:
     Supports multiple concurrent clients and various message types
     """
     
-    def __init__(self, host: str = "0.0.0.0", port: int = 8080):
+    def __init__(self, host: str = "0.0.0.0", port: int = 8080,
+                 max_clients: int = MAX_CLIENTS, accept_rate: int = ACCEPT_RATE):
         self.host = host
         self.port = port
-        self.server_socket = None
+        self.max_clients = max_clients
+        
+        # Token bucket limiting new connections per second
+        self.accept_rate = accept_rate
+        self._accept_tokens = float(accept_rate)
+        self._accept_refilled = time.monotonic()
+        self.server = None
+        self._stop_event = None
+        self._loop = None
+        self._loop_thread_id = None
         self.is_running = False
-        self.clients = {}  # client_id: socket
+        self.clients: Dict[str, Connection] = {}
         self.message_handlers = {}
         self.logger = logging.getLogger(__name__)
+        self._buffer_pool: List[bytearray] = []
+        
+        # Shared timestamps refreshed by _update_clock, and unique ID source
+        self._now = time.time()
+        self._now_iso = datetime.now().isoformat()
+        self._ids = itertools.count(1)
+        self._marks_counter = itertools.count(1)
+        
+        # Joins/leaves so far, and the status last broadcast (uptime excluded)
+        self._client_changes = 0
+        self._last_status_state = None
         
         # System status for client queries
         self.system_status = {
@@ -43,7 +264,7 @@ class MarkingSystemTCPServer:
             "marks_completed": 0,
             "error_count": 0,
             "uptime": 0,
-            "last_update": datetime.now().isoformat()
+            "last_update": self._now_iso
         }
         
         # Register default message handlers
@@ -64,117 +285,142 @@ class MarkingSystemTCPServer:
         Register a message handler for specific message types
         """
         self.message_handlers[message_type] = handler
-        self.logger.info(f"Registered handler for message type: {message_type}")
+        self.logger.info("Registered handler for message type: %s", message_type)
 
-    def start_server(self):
+    async def start_server(self, on_started: Optional[Callable[[], None]] = None):
         """
-        Start the TCP server and begin accepting connections
+        Start the TCP server and serve connections until stopped
+        One event loop multiplexes every client socket; on_started is
+        called once the listening socket is bound
         """
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(10)
+            self.server = await asyncio.get_running_loop().create_server(
+                lambda: Connection(self),
+                self.host,
+                self.port,
+                reuse_address=True,
+                backlog=10
+            )
             
             self.is_running = True
-            self.logger.info(f"TCP Server started on {self.host}:{self.port}")
+            self._stop_event = asyncio.Event()
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+            self.logger.info("TCP Server started on %s:%s", self.host, self.port)
+            if on_started:
+                on_started()
             
-            # Start server monitoring thread
-            monitoring_thread = threading.Thread(target=self._monitor_system, daemon=True)
-            monitoring_thread.start()
+            # Start clock and server monitoring tasks
+            clock_task = asyncio.create_task(self._update_clock())
+            monitoring_task = asyncio.create_task(self._monitor_system())
             
-            # Accept client connections
-            while self.is_running:
-                try:
-                    client_socket, client_address = self.server_socket.accept()
-                    client_id = f"client_{int(time.time())}_{client_address[1]}"
-                    
-                    self.clients[client_id] = {
-                        "socket": client_socket,
-                        "address": client_address,
-                        "connected_at": datetime.now().isoformat(),
-                        "last_activity": time.time()
-                    }
-                    
-                    # Start client handler thread
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client_socket, client_id),
-                        daemon=True
-                    )
-                    client_thread.start()
-                    
-                    self.logger.info(f"New client connected: {client_id} from {client_address}")
-                    
-                except socket.error as e:
-                    if self.is_running:
-                        self.logger.error(f"Error accepting client connection: {e}")
-                        
+            # Accept client connections until stop_server() closes the listener
+            try:
+                await self.server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+            finally:
+                clock_task.cancel()
+                monitoring_task.cancel()
+                
         except Exception as e:
-            self.logger.error(f"Failed to start TCP server: {e}")
+            self.logger.error("Failed to start TCP server: %s", e)
             raise
 
-    def _handle_client(self, client_socket: socket.socket, client_id: str):
+    def _register_client(self, connection: Connection) -> str:
         """
-        Handle individual client connection
+        Record a newly accepted client connection
         """
-        buffer = ""
+        client_address = connection.transport.get_extra_info('peername')
+        client_id = f"client_{next(self._ids)}_{client_address[1]}"
         
-        try:
-            while self.is_running:
-                # Receive data from client
-                data = client_socket.recv(4096).decode('utf-8')
-                if not data:
-                    break
-                    
-                buffer += data
-                
-                # Process complete messages (assuming newline-delimited JSON)
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    if line.strip():
-                        self._process_message(line.strip(), client_id)
-                        
-                # Update client activity timestamp
-                self.clients[client_id]["last_activity"] = time.time()
-                
-        except socket.error as e:
-            self.logger.warning(f"Client {client_id} connection error: {e}")
-        finally:
-            self._disconnect_client(client_id)
+        connection.address = client_address
+        connection.connected_at = self._now_iso
+        connection.last_activity = self._now
+        self.clients[client_id] = connection
+        self._client_changes += 1
+        self.logger.info("New client connected: %s from %s", client_id, client_address)
+        return client_id
+
+    def _admit_client(self) -> bool:
+        """
+        Decide whether a newly accepted connection may be served
+        Rejects past max_clients or when the accept token bucket is empty
+        """
+        if len(self.clients) >= self.max_clients:
+            self.logger.warning("Rejecting connection: %s clients connected", len(self.clients))
+            return False
+        
+        now = time.monotonic()
+        self._accept_tokens = min(
+            float(self.accept_rate),
+            self._accept_tokens + (now - self._accept_refilled) * self.accept_rate
+        )
+        self._accept_refilled = now
+        if self._accept_tokens < 1.0:
+            self.logger.warning("Rejecting connection: accept rate limit reached")
+            return False
+        self._accept_tokens -= 1.0
+        return True
+
+    def _acquire_buffer(self) -> bytearray:
+        """
+        Take a receive buffer from the pool, allocating one if it is empty
+        """
+        if self._buffer_pool:
+            return self._buffer_pool.pop()
+        return bytearray(RECV_BUFFER_SIZE)
+
+    def _release_buffer(self, buffer: bytearray):
+        """
+        Return a receive buffer to the pool for the next connection
+        """
+        if len(self._buffer_pool) < MAX_POOLED_BUFFERS:
+            self._buffer_pool.append(buffer)
 
-    def _process_message(self, message_data: str, client_id: str):
+    async def _process_message(self, message_data: bytes, client_id: str):
         """
         Process incoming message from client
+        Handlers take and return plain message dicts and may be coroutines
         """
+        # Default heartbeats are answered without running the JSON parser
+        if self._reply_heartbeat(message_data, client_id):
+            return
+        
         try:
             # Parse JSON message
-            message_dict = json.loads(message_data)
-            message = NetworkMessage(**message_dict)
-            message.client_id = client_id
+            message = _loads(message_data)
+            message_type = message.get("message_type")
+            if "message_id" not in message or message_type is None:
+                raise ValueError("message_id and message_type are required")
+            message["client_id"] = client_id
+            message.setdefault("payload", {})
             
-            self.logger.debug(f"Received message: {message.message_type} from {client_id}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Received message: %s from %s", message_type, client_id)
             
             # Route message to appropriate handler
-            handler = self.message_handlers.get(message.message_type)
+            handler = self.message_handlers.get(message_type)
             if handler:
                 response = handler(message)
+                if inspect.isawaitable(response):
+                    response = await response
                 if response:
                     self._send_response(client_id, response)
             else:
-                self.logger.warning(f"No handler for message type: {message.message_type}")
+                self.logger.warning("No handler for message type: %s", message_type)
                 error_response = self._create_error_response(
-                    message.message_id,
-                    f"Unknown message type: {message.message_type}"
+                    message["message_id"],
+                    f"Unknown message type: {message_type}"
                 )
                 self._send_response(client_id, error_response)
                 
         except json.JSONDecodeError as e:
-            self.logger.error(f"Invalid JSON from client {client_id}: {e}")
+            self.logger.error("Invalid JSON from client %s: %s", client_id, e)
         except Exception as e:
-            self.logger.error(f"Error processing message from {client_id}: {e}")
+            self.logger.error("Error processing message from %s: %s", client_id, e)
 
-    def _handle_status_request(self, message: NetworkMessage) -> NetworkMessage:
+    def _handle_status_request(self, message: Dict) -> Dict:
         """
         Handle system status request
         """
@@ -184,81 +430,71 @@ class MarkingSystemTCPServer:
             "server_uptime": time.time() - self.system_status.get("start_time", time.time())
         }
         
-        return NetworkMessage(
-            message_id=f"response_{message.message_id}",
-            timestamp=datetime.now().isoformat(),
-            message_type="status_response",
-            payload=response_payload
-        )
+        return self._create_response(message["message_id"], "status_response", response_payload)
 
-    def _handle_marking_request(self, message: NetworkMessage) -> NetworkMessage:
+    def _handle_marking_request(self, message: Dict) -> Dict:
         """
         Handle marking operation request
         """
         try:
-            product_data = message.payload.get("product_data", {})
+            product_data = message["payload"].get("product_data", {})
             
             # Validate marking request
             if not product_data.get("serial_number"):
                 return self._create_error_response(
-                    message.message_id,
+                    message["message_id"],
                     "Missing required field: serial_number"
                 )
             
             # Simulate marking operation
             marking_result = {
                 "success": True,
-                "mark_id": f"mark_{int(time.time())}",
-                "completion_time": datetime.now().isoformat(),
+                "mark_id": f"mark_{next(self._ids)}",
+                "completion_time": self._now_iso,
                 "product_data": product_data
             }
             
             # Update system statistics
-            self.system_status["marks_completed"] += 1
-            self.system_status["last_update"] = datetime.now().isoformat()
+            self.system_status["marks_completed"] = next(self._marks_counter)
+            self.system_status["last_update"] = self._now_iso
             
-            return NetworkMessage(
-                message_id=f"response_{message.message_id}",
-                timestamp=datetime.now().isoformat(),
-                message_type="marking_response",
-                payload=marking_result
-            )
+            return self._create_response(message["message_id"], "marking_response", marking_result)
             
         except Exception as e:
-            return self._create_error_response(message.message_id, str(e))
+            return self._create_error_response(message["message_id"], str(e))
 
-    def _handle_configuration_update(self, message: NetworkMessage) -> NetworkMessage:
+    def _handle_configuration_update(self, message: Dict) -> Dict:
         """
         Handle system configuration updates
         """
         try:
-            config_data = message.payload.get("configuration", {})
+            config_data = message["payload"].get("configuration", {})
             
             # Validate and apply configuration
             # In production, would validate against schema
-            self.logger.info(f"Configuration update received: {list(config_data.keys())}")
+            self.logger.info("Configuration update received: %s", list(config_data.keys()))
             
-            return NetworkMessage(
-                message_id=f"response_{message.message_id}",
-                timestamp=datetime.now().isoformat(),
-                message_type="configuration_response",
-                payload={"success": True, "message": "Configuration updated"}
+            return self._create_response(
+                message["message_id"],
+                "configuration_response",
+                {"success": True, "message": "Configuration updated"}
             )
             
         except Exception as e:
-            return self._create_error_response(message.message_id, str(e))
+            return self._create_error_response(message["message_id"], str(e))
 
-    def _handle_system_command(self, message: NetworkMessage) -> NetworkMessage:
+    def _handle_system_command(self, message: Dict) -> Dict:
         """
         Handle system control commands
         """
-        command = message.payload.get("command")
+        command = message["payload"].get("command")
         
         if command == "shutdown":
             self.logger.info("Shutdown command received")
-            threading.Timer(1.0, self.stop_server).start()
+            asyncio.get_running_loop().call_later(1.0, self.stop_server)
             
         elif command == "reset_statistics":
+            self._marks_counter = itertools.count(1)
             self.system_status["marks_completed"] = 0
             self.system_status["error_count"] = 0
             
@@ -266,60 +502,110 @@ class MarkingSystemTCPServer:
             # Simulate system test
             pass
             
-        return NetworkMessage(
-            message_id=f"response_{message.message_id}",
-            timestamp=datetime.now().isoformat(),
-            message_type="command_response",
-            payload={"success": True, "command": command}
+        return self._create_response(
+            message["message_id"],
+            "command_response",
+            {"success": True, "command": command}
         )
 
-    def _handle_heartbeat(self, message: NetworkMessage) -> NetworkMessage:
+    def _handle_heartbeat(self, message: Dict) -> Dict:
         """
         Handle client heartbeat messages
         """
-        return NetworkMessage(
-            message_id=f"response_{message.message_id}",
-            timestamp=datetime.now().isoformat(),
-            message_type="heartbeat_response",
-            payload={"server_time": datetime.now().isoformat()}
+        return self._create_response(
+            message["message_id"],
+            "heartbeat_response",
+            {"server_time": self._now_iso}
         )
 
-    def _create_error_response(self, request_id: str, error_message: str) -> NetworkMessage:
+    def _create_response(self, request_id: str, message_type: str, payload: Dict) -> Dict:
+        """
+        Create standardized response message
+        """
+        return {
+            "message_id": f"response_{request_id}",
+            "timestamp": self._now_iso,
+            "message_type": message_type,
+            "payload": payload,
+            "client_id": ""
+        }
+
+    def _create_error_response(self, request_id: str, error_message: str) -> Dict:
         """
         Create standardized error response
         """
-        return NetworkMessage(
-            message_id=f"error_{request_id}",
-            timestamp=datetime.now().isoformat(),
-            message_type="error_response",
-            payload={"error": error_message}
-        )
+        return {
+            "message_id": f"error_{request_id}",
+            "timestamp": self._now_iso,
+            "message_type": "error_response",
+            "payload": {"error": error_message},
+            "client_id": ""
+        }
+
+    def _reply_heartbeat(self, message_data: bytes, client_id: str) -> bool:
+        """
+        Answer a heartbeat straight from the raw message bytes
+        Returns False when the message needs the full parser instead
+        """
+        if self.message_handlers.get("heartbeat") != self._handle_heartbeat:
+            return False
+        if not _HEARTBEAT_TYPE.search(message_data, 0, 128):
+            return False
+        # Field names must be unambiguous, e.g. not repeated inside the payload
+        if message_data.count(b'"message_type"') != 1 or message_data.count(b'"message_id"') != 1:
+            return False
+        match = _MESSAGE_ID.search(message_data)
+        if not match:
+            return False
+        
+        connection = self.clients.get(client_id)
+        if connection:
+            now = self._now_iso.encode()
+            connection.transport.write(_HEARTBEAT_REPLY % (match.group(1), now, now))
+        return True
 
-    def _send_response(self, client_id: str, response: NetworkMessage):
+    def _send_response(self, client_id: str, response: Dict):
         """
         Send response message to specific client
         """
         try:
-            client_info = self.clients.get(client_id)
-            if client_info:
-                message_json = json.dumps(asdict(response)) + '\n'
-                client_info["socket"].send(message_json.encode('utf-8'))
+            connection = self.clients.get(client_id)
+            if connection:
+                # Body and newline go out as one vectored write, without concatenating
+                connection.transport.writelines((_dumps(response), b'\n'))
         except Exception as e:
-            self.logger.error(f"Failed to send response to {client_id}: {e}")
+            self.logger.error("Failed to send response to %s: %s", client_id, e)
             self._disconnect_client(client_id)
 
-    def broadcast_message(self, message: NetworkMessage):
+    def broadcast_message(self, message: Dict):
         """
         Broadcast message to all connected clients
+        The message is serialized once for every recipient
+        """
+        if self._call_on_loop(self.broadcast_message, message):
+            return
+        
+        self._broadcast_bytes(_dumps(message) + b'\n')
+
+    def _broadcast_bytes(self, message_json: bytes):
+        """
+        Write an already serialized message line to every client
+        Clients whose transport is still flushing an earlier write past the
+        high-water mark are skipped
         """
-        message_json = json.dumps(asdict(message)) + '\n'
         disconnected_clients = []
         
-        for client_id, client_info in self.clients.items():
+        for client_id, connection in tuple(self.clients.items()):
+            transport = connection.transport
+            if transport.is_closing():
+                disconnected_clients.append(client_id)
+                continue
+            if connection.write_paused:
+                continue
             try:
-                client_info["socket"].send(message_json.encode('utf-8'))
+                transport.write(message_json)
             except Exception as e:
-                self.logger.error(f"Failed to broadcast to {client_id}: {e}")
+                self.logger.error("Failed to broadcast to %s: %s", client_id, e)
                 disconnected_clients.append(client_id)
         
         # Clean up disconnected clients
@@ -332,13 +618,24 @@ class MarkingSystemTCPServer:
         """
         if client_id in self.clients:
             try:
-                self.clients[client_id]["socket"].close()
+                self.clients[client_id].transport.close()
             except:
                 pass
             del self.clients[client_id]
-            self.logger.info(f"Client {client_id} disconnected")
+            self._client_changes += 1
+            self.logger.info("Client %s disconnected", client_id)
+
+    async def _update_clock(self):
+        """
+        Refresh the cached timestamps every 100 ms
+        Messages share one formatted time instead of calling datetime.now() each
+        """
+        while True:
+            self._now = time.time()
+            self._now_iso = datetime.now().isoformat()
+            await asyncio.sleep(0.1)
 
-    def _monitor_system(self):
+    async def _monitor_system(self):
         """
         Monitor system status and broadcast updates
         """
@@ -349,35 +646,52 @@ class MarkingSystemTCPServer:
                 self.system_status["client_count"] = len(self.clients)
                 
                 # Broadcast status update to monitoring clients
-                status_update = NetworkMessage(
-                    message_id=f"status_update_{int(time.time())}",
-                    timestamp=datetime.now().isoformat(),
-                    message_type="status_broadcast",
-                    payload={"system_status": self.system_status}
+                # Skip it when nothing but uptime changed and nobody joined or left
+                state = (
+                    self._client_changes,
+                    tuple(value for key, value in self.system_status.items() if key != "uptime")
                 )
+                if self.clients and state != self._last_status_state:
+                    self._last_status_state = state
+                    status_update = _STATUS_BROADCAST % (
+                        next(self._ids),
+                        self._now_iso.encode(),
+                        _dumps(self.system_status)
+                    )
+                    self._broadcast_bytes(status_update)
                 
-                # Only broadcast if there are clients
-                if self.clients:
-                    self.broadcast_message(status_update)
-                
-                time.sleep(30)  # Broadcast every 30 seconds
+                # Jittered wait so several servers do not broadcast in lockstep;
+                # stop_server() ends it immediately
+                try:
+                    await asyncio.wait_for(
+                        self._stop_event.wait(),
+                        STATUS_INTERVAL + random.uniform(-STATUS_JITTER, STATUS_JITTER)
+                    )
+                    break
+                except asyncio.TimeoutError:
+                    pass
                 
             except Exception as e:
-                self.logger.error(f"System monitoring error: {e}")
+                self.logger.error("System monitoring error: %s", e)
 
     def stop_server(self):
         """
         Stop the TCP server and close all connections
         """
+        if self._call_on_loop(self.stop_server):
+            return
+        
         self.is_running = False
+        if self._stop_event:
+            self._stop_event.set()
         
         # Disconnect all clients
         for client_id in list(self.clients.keys()):
             self._disconnect_client(client_id)
         
-        # Close server socket
-        if self.server_socket:
-            self.server_socket.close()
+        # Close listening socket; this also ends serve_forever()
+        if self.server:
+            self.server.close()
             
         self.logger.info("TCP Server stopped")
 
@@ -387,9 +701,20 @@ class MarkingSystemTCPServer:
         """
         return {
             client_id: {
-                "address": info["address"],
-                "connected_at": info["connected_at"],
-                "last_activity": info["last_activity"]
+                "address": connection.address,
+                "connected_at": connection.connected_at,
+                "last_activity": connection.last_activity
             }
-            for client_id, info in self.clients.items()
-        } 
\ No newline at end of file
+            for client_id, connection in tuple(self.clients.items())
+        }
+
+    def _call_on_loop(self, callback: Callable, *args) -> bool:
+        """
+        Hand a call made from another thread over to the event loop
+        Client state is only mutated on the loop thread, so it needs no lock.
+        Returns True if the call was scheduled rather than run here.
+        """
+        if self._loop is None or threading.get_ident() == self._loop_thread_id:
+            return False
+        self._loop.call_soon_threadsafe(callback, *args)
+        return True
\ No newline at end of file
@@ -0,0 +1,52 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Native Ethernet/IPv4 header parser for the network monitor
+Optional accelerator - build in place with:
+    cythonize -i tools/_net_parse.pyx
+network_monitor falls back to its pure-Python parser when this is not built
+"""
+
+from libc.stdint cimport uint8_t, uint32_t
+
+
+cdef inline uint32_t _read_u32(const uint8_t[:] frame, Py_ssize_t offset):
+    return ((<uint32_t>frame[offset] << 24) | (<uint32_t>frame[offset + 1] << 16) |
+            (<uint32_t>frame[offset + 2] << 8) | frame[offset + 3])
+
+
+def parse_frame(const uint8_t[:] frame):
+    """
+    Locate the headers of an Ethernet IPv4 TCP/UDP frame
+    Returns (protocol, source_ip, dest_ip, source_port, dest_port,
+    payload_offset) with addresses as 32-bit ints, or None for any other frame
+    """
+    cdef Py_ssize_t length = frame.shape[0]
+    cdef Py_ssize_t ip_offset = 14
+    cdef Py_ssize_t transport_offset, header_length
+    cdef uint8_t protocol
+    
+    # Ethernet: IPv4 ethertype with a full fixed IP header behind it
+    if length < ip_offset + 20 or frame[12] != 0x08 or frame[13] != 0x00:
+        return None
+    
+    protocol = frame[ip_offset + 9]
+    transport_offset = ip_offset + (frame[ip_offset] & 0x0F) * 4
+    if protocol == 6:
+        if length < transport_offset + 20:
+            return None
+        header_length = (frame[transport_offset + 12] >> 4) * 4
+    elif protocol == 17:
+        header_length = 8
+    else:
+        return None
+    if length < transport_offset + header_length:
+        return None
+    
+    return (
+        protocol,
+        _read_u32(frame, ip_offset + 12),
+        _read_u32(frame, ip_offset + 16),
+        (frame[transport_offset] << 8) | frame[transport_offset + 1],
+        (frame[transport_offset + 2] << 8) | frame[transport_offset + 3],
+        transport_offset + header_length
+    )
@@ -4,28 +4,297 @@ Demonstrates network analysis, protocol debugging, and monitoring capabilities
 Similar to Wireshark functionality for industrial environments
 """
 
+import ctypes
 import socket
 import struct
 import time
 import threading
+import queue
+import selectors
 import json
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import groupby
 import logging
 
-@dataclass
+# orjson is optional; fall back to the standard library encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bytes requested per recv on monitored connections; one syscall drains
+# everything the kernel has queued instead of one 4 KiB chunk at a time
+CAPTURE_READ_SIZE = 65536
+
+# Precompiled header layouts (Ethernet, IPv4, TCP/UDP ports, Modbus MBAP + function code)
+_ETH_HDR = struct.Struct('!6s6sH')
+_IP_HDR = struct.Struct('!BBHHHBBHII')
+_L4_PORTS = struct.Struct('!HH')
+_MODBUS_HDR = struct.Struct('>HHHBB')
+
+def _parse_frame(frame: Union[bytes, memoryview]) -> Optional[Tuple[int, int, int, int, int, int]]:
+    """
+    Locate the headers of an Ethernet IPv4 TCP/UDP frame
+    Returns (protocol, source_ip, dest_ip, source_port, dest_port,
+    payload_offset) with addresses as 32-bit ints, or None for any other frame
+    """
+    if len(frame) < _ETH_HDR.size + _IP_HDR.size or _ETH_HDR.unpack_from(frame, 0)[2] != 0x0800:
+        return None
+    
+    version_ihl, _, _, _, _, _, protocol, _, source_ip, dest_ip = _IP_HDR.unpack_from(frame, _ETH_HDR.size)
+    transport_offset = _ETH_HDR.size + (version_ihl & 0x0F) * 4
+    if protocol == 6:
+        if len(frame) < transport_offset + 20:
+            return None
+        header_length = (frame[transport_offset + 12] >> 4) * 4
+    elif protocol == 17:
+        header_length = 8
+    else:
+        return None
+    if len(frame) < transport_offset + header_length:
+        return None
+    
+    source_port, dest_port = _L4_PORTS.unpack_from(frame, transport_offset)
+    return protocol, source_ip, dest_ip, source_port, dest_port, transport_offset + header_length
+
+# Use the compiled frame parser when the optional extension is built
+try:
+    from tools._net_parse import parse_frame as _parse_frame
+except ImportError:
+    pass
+
+# Modbus function names indexed by function code (0-255)
+_MODBUS_FUNCTIONS = {
+    1: "Read Coils",
+    2: "Read Discrete Inputs",
+    3: "Read Holding Registers",
+    4: "Read Input Registers",
+    5: "Write Single Coil",
+    6: "Write Single Register",
+    15: "Write Multiple Coils",
+    16: "Write Multiple Registers"
+}
+_MODBUS_FN_NAMES = tuple(_MODBUS_FUNCTIONS.get(code, f"Unknown ({code})") for code in range(256))
+
+# Maps every byte to itself if printable ASCII, otherwise to '.'
+_PRINTABLE_TABLE = bytes(i if 32 <= i <= 126 else 0x2e for i in range(256))
+
+# Printable ASCII bytes, deleted with bytes.translate to test a payload
+_PRINTABLE_ASCII = bytes(range(32, 127))
+
+# IP protocol numbers as named by NetworkPacket.protocol
+_IP_PROTOCOLS = {6: "TCP", 17: "UDP"}
+
+# Well-known ports whose traffic always goes to one protocol parser
+_PORT_PROTOCOLS = {502: 'modbus', 44818: 'ethernet_ip'}
+
+# Classic BPF instruction encoding and the opcodes _compile_bpf_filter emits
+_BPF_INSN = struct.Struct('HBBI')
+_BPF_LD_W_ABS = 0x20   # A = word at [k]
+_BPF_LD_H_ABS = 0x28   # A = half-word at [k]
+_BPF_LD_B_ABS = 0x30   # A = byte at [k]
+_BPF_LD_H_IND = 0x48   # A = half-word at [X + k]
+_BPF_LDX_MSH = 0xb1    # X = 4 * ([k] & 0xf), the IP header length
+_BPF_JEQ = 0x15        # A == k ? jt : jf
+_BPF_JSET = 0x45       # A & k ? jt : jf
+_BPF_RET = 0x06        # return k bytes of the packet (0 drops it)
+_BPF_ACCEPT = 0x40000
+_BPF_DROP = "drop"
+SO_ATTACH_FILTER = getattr(socket, "SO_ATTACH_FILTER", 26)
+
+def _compile_bpf_filter(filters: Dict) -> bytes:
+    """
+    Compile the monitor filters into a classic BPF program for Ethernet frames
+    Accepts IPv4 TCP/UDP matching protocol_filter, ip_filter (source or
+    destination) and port_filter (destination port); everything else is
+    dropped in the kernel.
+    """
+    # (opcode, jump_true, jump_false, k); jumps are None (next) or _BPF_DROP
+    program = [
+        (_BPF_LD_H_ABS, None, None, 12),
+        (_BPF_JEQ, None, _BPF_DROP, 0x0800),
+        (_BPF_LD_B_ABS, None, None, 23),
+    ]
+    protocol_numbers = {name: number for number, name in _IP_PROTOCOLS.items()}
+    if filters.get('protocol_filter'):
+        program.append((_BPF_JEQ, None, _BPF_DROP, protocol_numbers.get(filters['protocol_filter'], 0)))
+    else:
+        program.append((_BPF_JEQ, 1, None, 6))
+        program.append((_BPF_JEQ, None, _BPF_DROP, 17))
+    
+    if filters.get('ip_filter'):
+        address = struct.unpack('!I', socket.inet_aton(filters['ip_filter']))[0]
+        program += [
+            (_BPF_LD_W_ABS, None, None, 26),
+            (_BPF_JEQ, 2, None, address),
+            (_BPF_LD_W_ABS, None, None, 30),
+            (_BPF_JEQ, None, _BPF_DROP, address),
+        ]
+    
+    if filters.get('port_filter'):
+        program += [
+            # Only the first fragment carries the transport header
+            (_BPF_LD_H_ABS, None, None, 20),
+            (_BPF_JSET, _BPF_DROP, None, 0x1fff),
+            (_BPF_LDX_MSH, None, None, 14),
+            (_BPF_LD_H_IND, None, None, 16),
+            (_BPF_JEQ, None, _BPF_DROP, int(filters['port_filter'])),
+        ]
+    
+    program.append((_BPF_RET, None, None, _BPF_ACCEPT))
+    drop_index = len(program)
+    program.append((_BPF_RET, None, None, 0))
+    
+    def offset(index: int, target) -> int:
+        if target == _BPF_DROP:
+            return drop_index - index - 1
+        return target or 0
+    
+    return b''.join(
+        _BPF_INSN.pack(opcode, offset(index, jump_true), offset(index, jump_false), k)
+        for index, (opcode, jump_true, jump_false, k) in enumerate(program)
+    )
+
+def _attach_bpf_filter(sock: socket.socket, program: bytes):
+    """
+    Install a classic BPF program on a socket with SO_ATTACH_FILTER
+    """
+    instructions = ctypes.create_string_buffer(program, len(program))
+    fprog = struct.pack('HL', len(program) // _BPF_INSN.size, ctypes.addressof(instructions))
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+
+def _dumps(obj) -> bytes:
+    """
+    Serialize to JSON bytes, rendering unsupported values such as bytes with str()
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str).encode('utf-8')
+
+def _loads(data: Union[bytes, memoryview]):
+    """
+    Parse JSON straight from a payload buffer
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(str(data, 'utf-8'))
+
+def _ip_to_int(address: str) -> int:
+    """
+    Dotted-quad IPv4 address as a 32-bit int
+    """
+    return int.from_bytes(socket.inet_aton(address), 'big')
+
+def _int_to_ip(address: int) -> str:
+    """
+    32-bit int IPv4 address in dotted-quad form
+    """
+    return socket.inet_ntoa(address.to_bytes(4, 'big'))
+
+_LOCALHOST_INT = _ip_to_int("127.0.0.1")
+
+# Captured packets retained for inspection and export; oldest are dropped
+MAX_CAPTURED_PACKETS = 100000
+
+# Traffic counters are kept per time bucket: 30 x 10 s covers the 5 min window
+BUCKET_SECONDS = 10
+TRAFFIC_BUCKETS = 30
+
+# Packets waiting for the decoder thread; capture drops rather than blocks
+DECODE_QUEUE_SIZE = 10000
+DECODE_BATCH_SIZE = 64
+
+# Capture slab size; received payloads are views into a shared slab
+CAPTURE_SLAB_SIZE = 1 << 20
+
 class NetworkPacket:
-    timestamp: float
-    source_ip: str
-    dest_ip: str
-    source_port: int
-    dest_port: int
-    protocol: str
-    payload_size: int
-    raw_data: bytes
-    decoded_content: Optional[Dict] = None
+    """
+    Captured packet record
+    Addresses are 32-bit ints; raw_data may be a memoryview into the
+    capture buffer it arrived in
+    """
+    
+    __slots__ = (
+        'timestamp', 'source_ip', 'dest_ip', 'source_port', 'dest_port',
+        'protocol', 'payload_size', 'raw_data', 'decoded_content'
+    )
+    
+    def __init__(self, timestamp: float, source_ip: int, dest_ip: int,
+                 source_port: int, dest_port: int, protocol: str, payload_size: int,
+                 raw_data: Union[bytes, memoryview], decoded_content: Optional[Dict] = None):
+        self.timestamp = timestamp
+        self.source_ip = source_ip
+        self.dest_ip = dest_ip
+        self.source_port = source_port
+        self.dest_port = dest_port
+        self.protocol = protocol
+        self.payload_size = payload_size
+        self.raw_data = raw_data
+        self.decoded_content = decoded_content
+    
+    def to_dict(self) -> Dict:
+        """
+        Packet fields as a dict, with addresses formatted and raw_data copied out to bytes
+        """
+        return {
+            "timestamp": self.timestamp,
+            "source_ip": _int_to_ip(self.source_ip),
+            "dest_ip": _int_to_ip(self.dest_ip),
+            "source_port": self.source_port,
+            "dest_port": self.dest_port,
+            "protocol": self.protocol,
+            "payload_size": self.payload_size,
+            "raw_data": bytes(self.raw_data),
+            "decoded_content": self.decoded_content
+        }
+
+class _CaptureBuffer:
+    """
+    Receive buffer handing out memoryview slices instead of per-recv bytes
+    A full slab is replaced rather than overwritten, so captured packets
+    keep valid views; it is freed once none of them reference it.
+    """
+    
+    __slots__ = ('view', 'offset')
+    
+    def __init__(self):
+        self._new_slab()
+    
+    def _new_slab(self):
+        self.view = memoryview(bytearray(CAPTURE_SLAB_SIZE))
+        self.offset = 0
+    
+    def recv(self, sock: socket.socket, size: int) -> memoryview:
+        """
+        Receive up to size bytes from sock into the slab
+        """
+        if self.offset + size > len(self.view):
+            self._new_slab()
+        start = self.offset
+        received = sock.recv_into(self.view[start:start + size])
+        self.offset = start + received
+        return self.view[start:self.offset]
+    
+    def recvfrom(self, sock: socket.socket, size: int) -> Tuple[memoryview, Tuple]:
+        """
+        Receive one datagram or frame of up to size bytes into the slab
+        """
+        if self.offset + size > len(self.view):
+            self._new_slab()
+        start = self.offset
+        received, address = sock.recvfrom_into(self.view[start:start + size])
+        self.offset = start + received
+        return self.view[start:self.offset], address
+
+@dataclass(slots=True)
+class _ConnStats:
+    packet_count: int = 0
+    total_bytes: int = 0
+    first_seen: float = 0.0
+    last_seen: float = 0.0
 
 @dataclass
 class ConnectionSummary:
@@ -39,25 +308,38 @@ class ConnectionSummary:
     last_seen: float
     connection_state: str
 
+def _connection_key(packet: NetworkPacket) -> Tuple:
+    """
+    connection_summary key for a packet
+    """
+    return (packet.source_ip, packet.source_port, packet.dest_ip, packet.dest_port)
+
 class IndustrialNetworkMonitor:
     """
     Network monitoring tool for industrial marking systems
     Captures and analyzes network traffic for debugging and optimization
     """
     
-    def __init__(self, interface: str = "0.0.0.0", capture_port: int = None):
+    def __init__(self, interface: str = "0.0.0.0", capture_port: int = None,
+                 marking_port: Optional[int] = None):
         self.interface = interface
         self.capture_port = capture_port
+        self.marking_port = marking_port
         self.is_monitoring = False
-        self.captured_packets = []
-        self.connection_summary = defaultdict(lambda: {
-            'packet_count': 0,
-            'total_bytes': 0,
-            'first_seen': None,
-            'last_seen': None
-        })
+        self.captured_packets = deque(maxlen=MAX_CAPTURED_PACKETS)
+        self.first_packet_time: Optional[float] = None
+        
+        # [bucket_start, packets, bytes, errors] per BUCKET_SECONDS of traffic
+        self._traffic_buckets = deque(maxlen=TRAFFIC_BUCKETS)
+        
+        # Capture threads only enqueue; one decoder thread decodes and records
+        self._decode_queue = queue.Queue(maxsize=DECODE_QUEUE_SIZE)
+        self.dropped_packets = 0
+        # (source_ip, source_port, dest_ip, dest_port) -> _ConnStats, addresses as ints
+        self.connection_summary: Dict[Tuple, _ConnStats] = {}
         self.protocol_stats = defaultdict(int)
         self.logger = logging.getLogger(__name__)
+        self._raw_socket: Optional[socket.socket] = None
         
         # Industrial protocol parsers
         self.protocol_parsers = {
@@ -73,6 +355,12 @@ class IndustrialNetworkMonitor:
             'protocol_filter': None,
             'content_filter': None
         }
+        # Filters in the form the per-packet checks compare against
+        self._port_filter: Optional[int] = None
+        self._ip_filter_int: Optional[int] = None
+        
+        # Payload decoder, specialised to the capture port in start_monitoring
+        self._decode = self._decode_packet_content
 
     def start_monitoring(self, duration: Optional[float] = None):
         """
@@ -81,10 +369,23 @@ class IndustrialNetworkMonitor:
         self.is_monitoring = True
         self.logger.info(f"Starting network monitoring on {self.interface}")
         
+        # A known capture port only ever carries one protocol
+        protocol = _PORT_PROTOCOLS.get(self.capture_port)
+        if self.capture_port is not None and self.capture_port == self.marking_port:
+            self._decode = self._decode_marking_stream
+        elif protocol:
+            self._decode = self.protocol_parsers[protocol]
+        else:
+            self._decode = self._decode_packet_content
+        
         # Start packet capture thread
         capture_thread = threading.Thread(target=self._capture_packets, daemon=True)
         capture_thread.start()
         
+        # Start decoder thread
+        decoder_thread = threading.Thread(target=self._decode_packets, daemon=True)
+        decoder_thread.start()
+        
         # Start analysis thread
         analysis_thread = threading.Thread(target=self._analyze_traffic, daemon=True)
         analysis_thread.start()
@@ -112,73 +413,82 @@ class IndustrialNetworkMonitor:
     def _monitor_tcp_port(self):
         """
         Monitor specific TCP port for marking system traffic
+        A single selector loop accepts and reads every monitored connection
         """
+        selector = selectors.DefaultSelector()
         try:
             # Create listening socket
             monitor_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             monitor_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             monitor_socket.bind((self.interface, self.capture_port))
             monitor_socket.listen(5)
-            monitor_socket.settimeout(1.0)
+            monitor_socket.setblocking(False)
+            selector.register(monitor_socket, selectors.EVENT_READ)
+            
+            # Connections are read one at a time, so they share one capture buffer
+            capture_buffer = _CaptureBuffer()
             
             self.logger.info(f"Monitoring TCP port {self.capture_port}")
             
             while self.is_monitoring:
-                try:
-                    client_socket, client_address = monitor_socket.accept()
-                    # Handle connection in separate thread
-                    connection_thread = threading.Thread(
-                        target=self._handle_monitored_connection,
-                        args=(client_socket, client_address),
-                        daemon=True
-                    )
-                    connection_thread.start()
-                    
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    if self.is_monitoring:
-                        self.logger.error(f"Connection accept error: {e}")
+                for key, _ in selector.select(timeout=1.0):
+                    if key.fileobj is monitor_socket:
+                        try:
+                            client_socket, client_address = monitor_socket.accept()
+                        except (BlockingIOError, InterruptedError):
+                            continue
+                        except Exception as e:
+                            if self.is_monitoring:
+                                self.logger.error(f"Connection accept error: {e}")
+                            continue
+                        client_socket.setblocking(False)
+                        # Record the local address the peer actually reached, not the bind address
+                        selector.register(client_socket, selectors.EVENT_READ, (
+                            _ip_to_int(client_address[0]), client_address[1],
+                            _ip_to_int(client_socket.getsockname()[0])
+                        ))
+                    elif not self._handle_monitored_connection(key.fileobj, key.data, capture_buffer):
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
                         
         except Exception as e:
             self.logger.error(f"TCP monitoring error: {e}")
+        finally:
+            for key in list(selector.get_map().values()):
+                key.fileobj.close()
+            selector.close()
 
-    def _handle_monitored_connection(self, client_socket: socket.socket, client_address: Tuple):
+    def _handle_monitored_connection(self, client_socket: socket.socket, client_address: Tuple,
+                                     capture_buffer: _CaptureBuffer) -> bool:
         """
-        Handle and monitor individual connection
+        Read whatever a monitored connection has ready
+        client_address is (peer address, peer port, local address), addresses as ints
+        Returns False once the connection has closed or failed
         """
-        connection_key = f"{client_address[0]}:{client_address[1]}"
-        
         try:
-            while self.is_monitoring:
-                data = client_socket.recv(4096)
-                if not data:
-                    break
-                
-                # Create packet record
-                packet = NetworkPacket(
-                    timestamp=time.time(),
-                    source_ip=client_address[0],
-                    dest_ip=self.interface,
-                    source_port=client_address[1],
-                    dest_port=self.capture_port,
-                    protocol="TCP",
-                    payload_size=len(data),
-                    raw_data=data
-                )
-                
-                # Try to decode content
-                packet.decoded_content = self._decode_packet_content(data)
-                
-                # Store packet if it passes filters
-                if self._passes_filters(packet):
-                    self.captured_packets.append(packet)
-                    self._update_connection_stats(packet)
-                
+            data = capture_buffer.recv(client_socket, CAPTURE_READ_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return True
         except Exception as e:
             self.logger.error(f"Connection monitoring error: {e}")
-        finally:
-            client_socket.close()
+            return False
+        if not data:
+            return False
+        
+        # Create packet record
+        packet = NetworkPacket(
+            timestamp=time.time(),
+            source_ip=client_address[0],
+            dest_ip=client_address[2],
+            source_port=client_address[1],
+            dest_port=self.capture_port,
+            protocol="TCP",
+            payload_size=len(data),
+            raw_data=data
+        )
+        
+        self._enqueue_packet(packet)
+        return True
 
     def _monitor_raw_traffic(self):
         """
@@ -187,21 +497,35 @@ class IndustrialNetworkMonitor:
         try:
             # Create raw socket (Linux/Unix)
             raw_socket = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.ntohs(0x0003))
+            self._raw_socket = raw_socket
+            self._apply_kernel_filter()
+            capture_buffer = _CaptureBuffer()
             
             while self.is_monitoring:
-                raw_data, addr = raw_socket.recvfrom(65565)
+                raw_data, addr = capture_buffer.recvfrom(raw_socket, 65536)
                 
                 # Parse Ethernet frame
                 packet = self._parse_raw_packet(raw_data)
-                if packet and self._passes_filters(packet):
-                    self.captured_packets.append(packet)
-                    self._update_connection_stats(packet)
+                if packet:
+                    self._enqueue_packet(packet)
                     
         except OSError as e:
             # Fallback to UDP monitoring if raw sockets not available
             self.logger.warning(f"Raw socket not available: {e}. Using UDP monitoring.")
             self._monitor_udp_traffic()
 
+    def _apply_kernel_filter(self):
+        """
+        Push the current filters into the raw socket's BPF program
+        Filtered-out frames are then dropped before they reach recvfrom
+        """
+        if self._raw_socket is None:
+            return
+        try:
+            _attach_bpf_filter(self._raw_socket, _compile_bpf_filter(self.filters))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Kernel packet filter not applied: {e}")
+
     def _monitor_udp_traffic(self):
         """
         Monitor UDP traffic as fallback
@@ -210,15 +534,16 @@ class IndustrialNetworkMonitor:
             udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             udp_socket.bind(('', 0))  # Bind to any available port
             udp_socket.settimeout(1.0)
+            capture_buffer = _CaptureBuffer()
             
             while self.is_monitoring:
                 try:
-                    data, addr = udp_socket.recvfrom(4096)
+                    data, addr = capture_buffer.recvfrom(udp_socket, 4096)
                     
                     packet = NetworkPacket(
                         timestamp=time.time(),
-                        source_ip=addr[0],
-                        dest_ip="localhost",
+                        source_ip=_ip_to_int(addr[0]),
+                        dest_ip=_LOCALHOST_INT,
                         source_port=addr[1],
                         dest_port=0,
                         protocol="UDP",
@@ -226,11 +551,7 @@ class IndustrialNetworkMonitor:
                         raw_data=data
                     )
                     
-                    packet.decoded_content = self._decode_packet_content(data)
-                    
-                    if self._passes_filters(packet):
-                        self.captured_packets.append(packet)
-                        self._update_connection_stats(packet)
+                    self._enqueue_packet(packet)
                         
                 except socket.timeout:
                     continue
@@ -238,104 +559,119 @@ class IndustrialNetworkMonitor:
         except Exception as e:
             self.logger.error(f"UDP monitoring error: {e}")
 
-    def _parse_raw_packet(self, raw_data: bytes) -> Optional[NetworkPacket]:
+    def _enqueue_packet(self, packet: NetworkPacket):
         """
-        Parse raw network packet
+        Hand a captured packet to the decoder thread without blocking capture
         """
         try:
-            # Parse Ethernet header (14 bytes)
-            eth_header = struct.unpack('!6s6sH', raw_data[:14])
-            eth_protocol = socket.ntohs(eth_header[2])
-            
-            # Check if IP packet
-            if eth_protocol == 8:  # IPv4
-                return self._parse_ip_packet(raw_data[14:])
-                
-        except Exception as e:
-            self.logger.debug(f"Raw packet parsing error: {e}")
-            
-        return None
+            self._decode_queue.put_nowait(packet)
+        except queue.Full:
+            self.dropped_packets += 1
 
-    def _parse_ip_packet(self, ip_data: bytes) -> Optional[NetworkPacket]:
+    def _decode_packets(self):
         """
-        Parse IP packet
+        Decode, filter and record captured packets in batches
         """
-        try:
-            # Parse IP header
-            ip_header = struct.unpack('!BBHHHBBH4s4s', ip_data[:20])
-            
-            source_ip = socket.inet_ntoa(ip_header[8])
-            dest_ip = socket.inet_ntoa(ip_header[9])
-            protocol = ip_header[6]
+        decode_queue = self._decode_queue
+        decode = self._decode
+        while self.is_monitoring:
+            try:
+                batch = [decode_queue.get(timeout=1.0)]
+            except queue.Empty:
+                continue
+            try:
+                while len(batch) < DECODE_BATCH_SIZE:
+                    batch.append(decode_queue.get_nowait())
+            except queue.Empty:
+                pass
             
-            # Parse TCP/UDP header
-            if protocol == 6:  # TCP
-                return self._parse_tcp_packet(ip_data[20:], source_ip, dest_ip)
-            elif protocol == 17:  # UDP
-                return self._parse_udp_packet(ip_data[20:], source_ip, dest_ip)
-                
-        except Exception as e:
-            self.logger.debug(f"IP packet parsing error: {e}")
+            accepted = []
+            for packet in batch:
+                try:
+                    # Store packet if it passes filters
+                    if self._passes_filters(packet):
+                        packet.decoded_content = decode(packet.raw_data)
+                        accepted.append(packet)
+                except Exception as e:
+                    self.logger.error(f"Packet decoding error: {e}")
             
-        return None
+            if accepted:
+                self.captured_packets.extend(accepted)
+                self._update_stats_batch(accepted)
 
-    def _parse_tcp_packet(self, tcp_data: bytes, source_ip: str, dest_ip: str) -> Optional[NetworkPacket]:
+    def _parse_raw_packet(self, raw_data: Union[bytes, memoryview]) -> Optional[NetworkPacket]:
         """
-        Parse TCP packet
+        Parse raw network packet
         """
         try:
-            tcp_header = struct.unpack('!HHLLBBHHH', tcp_data[:20])
-            source_port = tcp_header[0]
-            dest_port = tcp_header[1]
+            headers = _parse_frame(raw_data)
+            if headers is None:
+                return None
+            protocol, source_ip, dest_ip, source_port, dest_port, payload_offset = headers
+            
+            # Apply filters on header fields before building the packet
+            protocol_name = _IP_PROTOCOLS[protocol]
+            protocol_filter = self.filters['protocol_filter']
+            if protocol_filter and protocol_name != protocol_filter:
+                return None
+            port_filter = self._port_filter
+            if port_filter and dest_port != port_filter:
+                return None
+            ip_filter = self._ip_filter_int
+            if ip_filter is not None and source_ip != ip_filter and dest_ip != ip_filter:
+                return None
             
             # Extract payload
-            payload = tcp_data[20:]
+            payload = raw_data[payload_offset:]
             
-            packet = NetworkPacket(
+            return NetworkPacket(
                 timestamp=time.time(),
                 source_ip=source_ip,
                 dest_ip=dest_ip,
                 source_port=source_port,
                 dest_port=dest_port,
-                protocol="TCP",
+                protocol=protocol_name,
                 payload_size=len(payload),
                 raw_data=payload
             )
             
-            packet.decoded_content = self._decode_packet_content(payload)
-            return packet
-            
         except Exception as e:
-            self.logger.debug(f"TCP packet parsing error: {e}")
+            self.logger.debug(f"Raw packet parsing error: {e}")
             
         return None
 
-    def _decode_packet_content(self, data: bytes) -> Optional[Dict]:
+    def _decode_packet_content(self, data: Union[bytes, memoryview]) -> Optional[Dict]:
         """
         Decode packet content based on known protocols
+        Accepts bytes or a memoryview into a capture buffer
         """
         try:
             # Try to decode as JSON (marking system protocol)
-            if data.startswith(b'{'):
-                return json.loads(data.decode('utf-8'))
+            if data[:1] == b'{':
+                return _loads(data)
                 
             # Try to decode as Modbus
             if len(data) >= 8 and data[2:4] == b'\x00\x00':
                 return self._parse_modbus_packet(data)
                 
-            # Try to decode as text
-            try:
-                text = data.decode('utf-8')
-                if text.isprintable():
-                    return {"content_type": "text", "data": text}
-            except UnicodeDecodeError:
-                pass
+            # Try to decode as text; printable ASCII is recognised on the
+            # bytes, and pure-ASCII payloads with control bytes never build a str
+            payload = bytes(data)
+            if not payload.translate(None, _PRINTABLE_ASCII):
+                return {"content_type": "text", "data": payload.decode('ascii')}
+            if not payload.isascii():
+                try:
+                    text = payload.decode('utf-8')
+                    if text.isprintable():
+                        return {"content_type": "text", "data": text}
+                except UnicodeDecodeError:
+                    pass
                 
             # Return hex representation for binary data
             return {
                 "content_type": "binary",
-                "hex_data": data.hex(),
-                "ascii_preview": ''.join(chr(b) if 32 <= b <= 126 else '.' for b in data[:32])
+                "hex_data": payload.hex(),
+                "ascii_preview": payload[:32].translate(_PRINTABLE_TABLE).decode('ascii')
             }
             
         except Exception as e:
@@ -351,12 +687,8 @@ class IndustrialNetworkMonitor:
             return {"protocol": "modbus", "error": "packet too short"}
             
         try:
-            # Modbus TCP header
-            transaction_id = struct.unpack('>H', data[0:2])[0]
-            protocol_id = struct.unpack('>H', data[2:4])[0]
-            length = struct.unpack('>H', data[4:6])[0]
-            unit_id = data[6]
-            function_code = data[7]
+            # Modbus TCP header and function code in one unpack
+            transaction_id, protocol_id, length, unit_id, function_code = _MODBUS_HDR.unpack_from(data, 0)
             
             return {
                 "protocol": "modbus",
@@ -365,28 +697,12 @@ class IndustrialNetworkMonitor:
                 "length": length,
                 "unit_id": unit_id,
                 "function_code": function_code,
-                "function_name": self._get_modbus_function_name(function_code)
+                "function_name": _MODBUS_FN_NAMES[function_code]
             }
             
         except Exception as e:
             return {"protocol": "modbus", "error": str(e)}
 
-    def _get_modbus_function_name(self, function_code: int) -> str:
-        """
-        Get Modbus function name from code
-        """
-        function_names = {
-            1: "Read Coils",
-            2: "Read Discrete Inputs",
-            3: "Read Holding Registers",
-            4: "Read Input Registers",
-            5: "Write Single Coil",
-            6: "Write Single Register",
-            15: "Write Multiple Coils",
-            16: "Write Multiple Registers"
-        }
-        return function_names.get(function_code, f"Unknown ({function_code})")
-
     def _parse_ethernet_ip_packet(self, data: bytes) -> Dict:
         """
         Parse EtherNet/IP packet
@@ -399,24 +715,51 @@ class IndustrialNetworkMonitor:
         """
         try:
             # Assume JSON-based protocol
-            content = json.loads(data.decode('utf-8'))
-            return {
-                "protocol": "marking_system",
-                "message_type": content.get("message_type"),
-                "payload_size": len(content.get("payload", {})),
-                "timestamp": content.get("timestamp")
-            }
+            return self._summarize_marking_message(_loads(data))
         except:
             return {"protocol": "marking_system", "error": "decode failed"}
 
+    def _decode_marking_stream(self, data: Union[bytes, memoryview]) -> Optional[Dict]:
+        """
+        Decode a stream read from the marking system port
+        One read may carry several newline-delimited messages; a read that is
+        not whole JSON lines goes through the generic decoder instead
+        """
+        try:
+            messages = [
+                self._summarize_marking_message(_loads(line))
+                for line in bytes(data).split(b'\n') if line.strip()
+            ]
+        except Exception:
+            return self._decode_packet_content(data)
+        if not messages:
+            return self._decode_packet_content(data)
+        if len(messages) == 1:
+            return messages[0]
+        return {"protocol": "marking_system", "messages": messages}
+
+    @staticmethod
+    def _summarize_marking_message(content: Dict) -> Dict:
+        """
+        Summary of one decoded marking system message
+        """
+        return {
+            "protocol": "marking_system",
+            "message_type": content.get("message_type"),
+            "payload_size": len(content.get("payload", {})),
+            "timestamp": content.get("timestamp")
+        }
+
     def _passes_filters(self, packet: NetworkPacket) -> bool:
         """
         Check if packet passes configured filters
         """
-        if self.filters['port_filter'] and packet.dest_port != self.filters['port_filter']:
+        port_filter = self._port_filter
+        if port_filter and packet.dest_port != port_filter:
             return False
             
-        if self.filters['ip_filter'] and self.filters['ip_filter'] not in [packet.source_ip, packet.dest_ip]:
+        ip_filter = self._ip_filter_int
+        if ip_filter is not None and packet.source_ip != ip_filter and packet.dest_ip != ip_filter:
             return False
             
         if self.filters['protocol_filter'] and packet.protocol != self.filters['protocol_filter']:
@@ -424,21 +767,56 @@ class IndustrialNetworkMonitor:
             
         return True
 
-    def _update_connection_stats(self, packet: NetworkPacket):
+    def _update_stats_batch(self, packets: List[NetworkPacket]):
         """
-        Update connection statistics
+        Update connection, protocol and traffic statistics for a batch of packets
+        Consecutive packets of the same connection are applied as one update
         """
-        connection_key = f"{packet.source_ip}:{packet.source_port}->{packet.dest_ip}:{packet.dest_port}"
+        if self.first_packet_time is None:
+            self.first_packet_time = packets[0].timestamp
+        connection_summary = self.connection_summary
+        protocol_stats = self.protocol_stats
+        buckets = self._traffic_buckets
         
-        stats = self.connection_summary[connection_key]
-        stats['packet_count'] += 1
-        stats['total_bytes'] += packet.payload_size
-        
-        if stats['first_seen'] is None:
-            stats['first_seen'] = packet.timestamp
-        stats['last_seen'] = packet.timestamp
-        
-        self.protocol_stats[packet.protocol] += 1
+        for connection_key, group in groupby(packets, _connection_key):
+            group = list(group)
+            last = group[-1]
+            group_bytes = sum(packet.payload_size for packet in group)
+            errors = sum(1 for packet in group
+                         if isinstance(packet.decoded_content, dict) and 'error' in packet.decoded_content)
+            
+            stats = connection_summary.get(connection_key)
+            if stats is None:
+                stats = connection_summary.setdefault(connection_key, _ConnStats(first_seen=group[0].timestamp))
+            stats.packet_count += len(group)
+            stats.total_bytes += group_bytes
+            stats.last_seen = last.timestamp
+            
+            protocol_stats[last.protocol] += len(group)
+            
+            # Per-bucket traffic counters so the analyzers never rescan packets
+            bucket_start = int(last.timestamp) // BUCKET_SECONDS * BUCKET_SECONDS
+            if not buckets or bucket_start > buckets[-1][0]:
+                buckets.append([bucket_start, 0, 0, 0])
+            bucket = buckets[-1]
+            bucket[1] += len(group)
+            bucket[2] += group_bytes
+            bucket[3] += errors
+    
+    def _recent_traffic(self, window: float, now: float) -> Tuple[int, int, int]:
+        """
+        Sum packets, bytes and errors over the buckets within window seconds of now
+        """
+        cutoff = now - window
+        packets = total_bytes = errors = 0
+        # Snapshot first: the decoder thread appends buckets concurrently
+        for bucket_start, bucket_packets, bucket_bytes, bucket_errors in reversed(tuple(self._traffic_buckets)):
+            if bucket_start + BUCKET_SECONDS <= cutoff:
+                break
+            packets += bucket_packets
+            total_bytes += bucket_bytes
+            errors += bucket_errors
+        return packets, total_bytes, errors
 
     def _analyze_traffic(self):
         """
@@ -450,42 +828,40 @@ class IndustrialNetworkMonitor:
                 time.sleep(10)
                 
                 if self.captured_packets:
-                    self._detect_anomalies()
-                    self._generate_performance_metrics()
+                    # One clock read per analysis pass
+                    now = time.time()
+                    self._detect_anomalies(now)
+                    self._generate_performance_metrics(now)
                     
             except Exception as e:
                 self.logger.error(f"Traffic analysis error: {e}")
 
-    def _detect_anomalies(self):
+    def _detect_anomalies(self, now: float):
         """
         Detect network anomalies and potential issues
         """
         # Check for unusual traffic patterns
-        recent_packets = [p for p in self.captured_packets if time.time() - p.timestamp < 60]
+        recent_packets, _, recent_errors = self._recent_traffic(60, now)
         
-        if len(recent_packets) > 1000:
+        if recent_packets > 1000:
             self.logger.warning("High traffic volume detected")
             
         # Check for failed connections
-        error_packets = [p for p in recent_packets if p.decoded_content and 
-                        isinstance(p.decoded_content, dict) and 
-                        'error' in p.decoded_content]
-        
-        if len(error_packets) > 10:
-            self.logger.warning(f"High error rate detected: {len(error_packets)} errors in last minute")
+        if recent_errors > 10:
+            self.logger.warning(f"High error rate detected: {recent_errors} errors in last minute")
 
-    def _generate_performance_metrics(self):
+    def _generate_performance_metrics(self, now: float):
         """
         Generate network performance metrics
         """
         if not self.captured_packets:
             return
             
-        recent_packets = [p for p in self.captured_packets if time.time() - p.timestamp < 300]
+        recent_packets, recent_bytes, _ = self._recent_traffic(300, now)
         
         metrics = {
-            "packets_per_minute": len(recent_packets) / 5,
-            "average_packet_size": sum(p.payload_size for p in recent_packets) / len(recent_packets),
+            "packets_per_minute": recent_packets / 5,
+            "average_packet_size": recent_bytes / recent_packets if recent_packets else 0,
             "protocol_distribution": dict(self.protocol_stats),
             "connection_count": len(self.connection_summary)
         }
@@ -497,18 +873,30 @@ class IndustrialNetworkMonitor:
         Set monitoring filter
         """
         if filter_type in self.filters:
+            # Convert before storing so an invalid value leaves the filters unchanged
+            try:
+                if filter_type == 'port_filter':
+                    self._port_filter = int(value) if value else None
+                elif filter_type == 'ip_filter':
+                    self._ip_filter_int = _ip_to_int(value) if value else None
+            except (OSError, TypeError, ValueError):
+                self.logger.error(f"Ignoring invalid {filter_type} value: {value!r}")
+                return
             self.filters[filter_type] = value
             self.logger.info(f"Set {filter_type} filter to {value}")
+            self._apply_kernel_filter()
 
     def get_capture_summary(self) -> Dict:
         """
         Get summary of captured traffic
         """
+        now = time.time()
         return {
             "total_packets": len(self.captured_packets),
             "protocol_stats": dict(self.protocol_stats),
             "connection_count": len(self.connection_summary),
-            "capture_duration": time.time() - (self.captured_packets[0].timestamp if self.captured_packets else time.time()),
+            "dropped_packets": self.dropped_packets,
+            "capture_duration": now - (self.first_packet_time or now),
             "filters_active": {k: v for k, v in self.filters.items() if v is not None}
         }
 
@@ -518,12 +906,17 @@ class IndustrialNetworkMonitor:
         """
         try:
             if format == "json":
-                with open(filename, 'w') as f:
-                    capture_data = {
-                        "summary": self.get_capture_summary(),
-                        "packets": [asdict(p) for p in self.captured_packets]
-                    }
-                    json.dump(capture_data, f, indent=2, default=str)
+                # Stream one packet at a time so memory stays flat for large captures
+                packets = list(self.captured_packets)
+                with open(filename, 'wb') as f:
+                    f.write(b'{"summary":')
+                    f.write(_dumps(self.get_capture_summary()))
+                    f.write(b',"packets":[')
+                    for index, packet in enumerate(packets):
+                        if index:
+                            f.write(b',')
+                        f.write(_dumps(packet.to_dict()))
+                    f.write(b']}')
                     
             self.logger.info(f"Capture exported to {filename}")
             
@@ -537,16 +930,47 @@ class IndustrialNetworkMonitor:
         self.is_monitoring = False
         self.logger.info("Network monitoring stopped")
 
-    def get_connection_details(self, connection_key: str) -> Optional[Dict]:
+    def get_connection_details(self, connection_key: Union[str, Tuple]) -> Optional[Dict]:
         """
         Get detailed information about specific connection
+        Accepts a connection_summary key or its "ip:port->ip:port" form
         """
-        if connection_key in self.connection_summary:
-            stats = self.connection_summary[connection_key]
-            return {
-                "connection": connection_key,
-                "statistics": stats,
-                "duration": stats['last_seen'] - stats['first_seen'] if stats['first_seen'] else 0,
-                "average_packet_size": stats['total_bytes'] / stats['packet_count'] if stats['packet_count'] else 0
-            }
-        return None 
\ No newline at end of file
+        if isinstance(connection_key, str):
+            connection_key = self._parse_connection_key(connection_key)
+        
+        stats = self.connection_summary.get(connection_key)
+        if stats is None:
+            return None
+        
+        return {
+            "connection": self._format_connection_key(connection_key),
+            "statistics": {
+                "packet_count": stats.packet_count,
+                "total_bytes": stats.total_bytes,
+                "first_seen": stats.first_seen,
+                "last_seen": stats.last_seen
+            },
+            "duration": stats.last_seen - stats.first_seen,
+            "average_packet_size": stats.total_bytes / stats.packet_count if stats.packet_count else 0
+        }
+
+    @staticmethod
+    def _format_connection_key(connection_key: Tuple) -> str:
+        """
+        Format a connection key as "ip:port->ip:port"
+        """
+        source_ip, source_port, dest_ip, dest_port = connection_key
+        return f"{_int_to_ip(source_ip)}:{source_port}->{_int_to_ip(dest_ip)}:{dest_port}"
+
+    @staticmethod
+    def _parse_connection_key(connection: str) -> Optional[Tuple]:
+        """
+        Parse an "ip:port->ip:port" string back into a connection key
+        """
+        try:
+            source, dest = connection.split("->")
+            source_ip, source_port = source.rsplit(":", 1)
+            dest_ip, dest_port = dest.rsplit(":", 1)
+            return (_ip_to_int(source_ip), int(source_port), _ip_to_int(dest_ip), int(dest_port))
+        except (ValueError, OSError):
+            return None 
\ No newline at end of file